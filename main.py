@@ -1,20 +1,15 @@
 import customtkinter as ctk, tkinter as tk, numpy as np
 from tkinter import scrolledtext, filedialog, messagebox, ttk, Toplevel, simpledialog, Label
-import platform, os, shutil, rasterio
+import platform, os, shutil
 import pandas as pd
-from collections import defaultdict
+from collections import defaultdict, OrderedDict
 import tkinter.font as tkfont
-import geopandas as gpd, matplotlib.pyplot as plt
-from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg, NavigationToolbar2Tk
-from rasterio.plot import show
-from matplotlib.figure import Figure
-import mplcursors
-from matplotlib.lines import Line2D
 import requests
 from datetime import datetime
 from io import StringIO
-from concurrent.futures import ThreadPoolExecutor, as_completed
-import threading, queue
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, as_completed
+import threading, queue, sys, time, argparse, sqlite3, json, itertools, functools, multiprocessing, traceback
+from contextlib import closing, contextmanager, ExitStack
 
 # Directory paths
 DATABASE_FOLDER = "database"
@@ -22,16 +17,86 @@ SHP_PATH = os.path.join("backend_datasets", 'australia.shp')
 BASEMAP_PATH = os.path.join( "backend_datasets", 'australia_basemap_wgs84.TIF')
 SITE_LIST_FILE = os.path.join(DATABASE_FOLDER, "site_list.csv")
 SITE_FILES_FOLDER = os.path.join(DATABASE_FOLDER, "site_files")
+SQLITE_DB_FILE = os.path.join(DATABASE_FOLDER, "ngros.sqlite")
+ROLLUPS_FOLDER = os.path.join(DATABASE_FOLDER, "rollups")
+LOCKS_FOLDER = os.path.join(DATABASE_FOLDER, "locks")
 display_selection = None
 
+# Storage backend: "csv" (site_list.csv plus one CSV per site file) or "sqlite" (SQLITE_DB_FILE)
+DATABASE_BACKEND = os.environ.get("NGROS_BACKEND", "csv")
+SITE_LIST_COLUMNS = ["Serial No.", "File Name", "Site ID", "Latitude", "Longitude"]
+
+# local_time is stored as ISO text in SQLite so that string order is time order
+SQLITE_TIME_FORMAT = "%Y-%m-%d %H:%M:%S"
+SQLITE_BUSY_TIMEOUT = 60  # seconds
+SQLITE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS sites (
+    serial_no INTEGER,
+    file_name TEXT PRIMARY KEY,
+    site_id TEXT,
+    latitude REAL,
+    longitude REAL,
+    columns TEXT
+);
+CREATE TABLE IF NOT EXISTS observations (
+    file_name TEXT NOT NULL,
+    local_time TEXT NOT NULL,
+    entity_id TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_observations_file_time ON observations (file_name, local_time);
+CREATE TABLE IF NOT EXISTS rollups (
+    file_name TEXT NOT NULL,
+    level TEXT NOT NULL,
+    period TEXT NOT NULL,
+    parameter TEXT NOT NULL,
+    mean REAL,
+    min REAL,
+    max REAL,
+    sum REAL,
+    count INTEGER,
+    PRIMARY KEY (file_name, level, period, parameter)
+);
+"""
+sqlite3.register_adapter(np.int64, int)
+sqlite3.register_adapter(np.float32, float)
+
 os.makedirs(SITE_FILES_FOLDER, exist_ok=True)
+os.makedirs(ROLLUPS_FOLDER, exist_ok=True)
+os.makedirs(LOCKS_FOLDER, exist_ok=True)
 if not os.path.exists(SITE_LIST_FILE):
-    pd.DataFrame(columns=["Serial No.", "File Name", "Site ID", "Latitude", "Longitude"]).to_csv(SITE_LIST_FILE, index=False)
+    pd.DataFrame(columns=SITE_LIST_COLUMNS).to_csv(SITE_LIST_FILE, index=False)
+
+# In-memory schema for the cached views of site data (tables, plots, queries). float32 keeps about 7 significant
+# digits, enough to display any logger or POWER value; entity_id repeats on every row of a file. Data that is
+# written back or stored is loaded with exact=True and keeps its measurements as read (float64).
+POWER_PARAMETERS = ['PRECTOTCORR', 'T2M', 'RH2M', 'WS2M', 'ALLSKY_SFC_SW_DWN']
+SITE_DATA_SCHEMA = {'entity_id': 'category', 'drip_rate': 'float32', **{param: 'float32' for param in POWER_PARAMETERS}}
+LOCAL_TIME_FORMATS = ("%d/%m/%Y %H:%M", "%d-%m-%Y %H:%M", "%d-%m-%Y %H:%M:%S", "%Y-%m-%d %H:%M:%S")
+
+# Precomputed rollups of every site file, finest to coarsest: (pandas period frequency, nominal length).
+# Plots of long time spans and the table averages read these instead of the raw rows.
+ROLLUP_LEVELS = {'daily': ('D', pd.Timedelta(days=1)), 'weekly': ('W', pd.Timedelta(days=7)), 'monthly': ('M', pd.Timedelta(days=30))}
+ROLLUP_COLUMNS = ['level', 'period', 'parameter', 'mean', 'min', 'max', 'sum', 'count']
+ROLLUP_SUM_PARAMETERS = ['PRECTOTCORR']  # precipitation totals; other parameters have no meaningful sum
+MAX_PLOT_POINTS = 2000
+
+# Site files larger than this are updated block by block (CSV backend) instead of being loaded whole
+CHUNKED_UPDATE_MB = int(os.environ.get("NGROS_CHUNKED_UPDATE_MB", 256))
+UPDATE_CHUNK_ROWS = 200_000
+
+# Columns expected in a bulk import manifest (same names as in site_list.csv)
+MANIFEST_COLUMNS = ["File Name", "Site ID", "Latitude", "Longitude"]
 
 # Functions
+def save_site_list(df):
+    # Write to a temporary file first so an interrupted write never leaves a truncated site list
+    tmp_path = f"{SITE_LIST_FILE}.tmp"
+    df.to_csv(tmp_path, index=False)
+    os.replace(tmp_path, SITE_LIST_FILE)
+
 def load_site_list():
     if os.path.exists(SITE_LIST_FILE):
-        df = pd.read_csv(SITE_LIST_FILE)
+        df = read_site_list()
         out_text.delete(1.0, ctk.END)
         out_text.insert(ctk.END, df.to_string(index=False))
         out_text.insert(ctk.END, "\n")
@@ -43,13 +108,848 @@ def parse_date(date_str):
     if isinstance(date_str, datetime):
         return date_str
     
-    for fmt in ("%d/%m/%Y %H:%M", "%d-%m-%Y %H:%M", "%d-%m-%Y %H:%M:%S", "%Y-%m-%d %H:%M:%S"):
+    for fmt in LOCAL_TIME_FORMATS:
         try:
             return datetime.strptime(date_str, fmt)
         except ValueError:
             continue
     raise ValueError(f"Date {date_str} is not in an expected format.")
 
+def parse_local_time(values):
+    # Column-wise parse_date: try each format on the whole column, and only fall back to
+    # parsing value by value when a file mixes formats
+    if pd.api.types.is_datetime64_any_dtype(values):
+        return values
+    for fmt in LOCAL_TIME_FORMATS:
+        try:
+            return pd.to_datetime(values, format=fmt)
+        except (ValueError, TypeError):
+            continue
+    return pd.to_datetime(values.apply(parse_date))
+
+def apply_site_schema(df, exact=False):
+    # Cast a freshly loaded site DataFrame to SITE_DATA_SCHEMA; non-numeric measurement columns are left as read.
+    # exact: leave the numeric columns as read, for data that is written back (read-merge-write, imports)
+    if 'local_time' in df.columns:
+        df['local_time'] = parse_local_time(df['local_time'])
+    for col, dtype in SITE_DATA_SCHEMA.items():
+        if exact and dtype != 'category':
+            continue
+        if col in df.columns and (dtype == 'category' or pd.api.types.is_numeric_dtype(df[col])):
+            df[col] = df[col].astype(dtype)
+    return df
+
+def exact_float64(values):
+    # float32 is for in-memory views only. Widening it directly adds binary noise (3.01 -> 3.009999990463257),
+    # so values that are stored or summarized go through their shortest float32 text, which is the value as read.
+    if values.dtype == np.float32:
+        return values.astype(str).astype('float64')
+    return values.astype('float64')
+
+# Storage: every read and write of the site list and site data goes through these functions,
+# which dispatch on DATABASE_BACKEND
+def sqlite_connect():
+    # Autocommit mode; writes are grouped explicitly with sqlite_transaction(). The busy timeout covers
+    # a commit waiting for long reads to finish.
+    conn = sqlite3.connect(SQLITE_DB_FILE, isolation_level=None, timeout=SQLITE_BUSY_TIMEOUT)
+    conn.executescript(SQLITE_SCHEMA)
+    return conn
+
+@contextmanager
+def sqlite_transaction():
+    # SQLite allows one writer at a time, so write transactions on any site file also take the
+    # database-wide SQLITE_WRITE_LOCK and queue behind each other instead of failing as "database is locked"
+    with file_lock(SQLITE_WRITE_LOCK):
+        conn = sqlite_connect()
+        try:
+            # Outside the rollback handler: if BEGIN fails there is no transaction to roll back
+            conn.execute("BEGIN IMMEDIATE")
+        except BaseException:
+            conn.close()
+            raise
+        try:
+            yield conn
+            conn.execute("COMMIT")
+        except BaseException:
+            if conn.in_transaction:
+                conn.execute("ROLLBACK")
+            raise
+        finally:
+            conn.close()
+
+def _sql_columns(columns):
+    return ', '.join(f'"{col}"' for col in columns)
+
+def _sqlite_write_observations(conn, file_name, df):
+    df = df.drop(columns=[col for col in df.columns if col.startswith('Unnamed:')])
+    existing_columns = {row[1] for row in conn.execute("PRAGMA table_info(observations)")}
+    for col in df.columns:
+        if col not in existing_columns:
+            conn.execute(f'ALTER TABLE observations ADD COLUMN "{col}" REAL')
+
+    records = df.copy()
+    for col in records.columns:
+        if records[col].dtype == np.float32:
+            records[col] = exact_float64(records[col])
+    records['local_time'] = parse_local_time(records['local_time']).dt.strftime(SQLITE_TIME_FORMAT)
+    records.insert(0, 'file_name', file_name)
+    records = records.astype(object).where(records.notna(), None)
+    placeholders = ', '.join('?' * len(records.columns))
+    conn.execute("DELETE FROM observations WHERE file_name = ?", (file_name,))
+    conn.executemany(f"INSERT INTO observations ({_sql_columns(records.columns)}) VALUES ({placeholders})",
+                     records.itertuples(index=False, name=None))
+    conn.execute("UPDATE sites SET columns = ? WHERE file_name = ?", (json.dumps(list(df.columns)), file_name))
+
+def read_site_list():
+    if DATABASE_BACKEND == "sqlite":
+        with closing(sqlite_connect()) as conn:
+            return pd.read_sql_query('SELECT serial_no AS "Serial No.", file_name AS "File Name", site_id AS "Site ID", '
+                                     'latitude AS "Latitude", longitude AS "Longitude" FROM sites ORDER BY serial_no', conn)
+    return pd.read_csv(SITE_LIST_FILE)
+
+def list_site_files():
+    if DATABASE_BACKEND == "sqlite":
+        return read_site_list()['File Name'].tolist()
+    return [f for f in os.listdir(SITE_FILES_FOLDER) if f.endswith('.csv')]
+
+def add_site_records(rows, rollups=None):
+    # rows: list of dicts with File Name, Site ID, Latitude and Longitude; the site files must already be
+    # in SITE_FILES_FOLDER. Serial numbers are assigned here, under the site list lock, so concurrent additions cannot share one.
+    # rollups: optional {File Name: rollups} already computed by the caller; the rest are computed here.
+    with file_lock(SITE_LIST_LOCK):
+        _add_site_records(rows, dict(rollups or {}))
+    for row in rows:
+        invalidate_site_cache(row['File Name'])
+    invalidate_site_index()
+
+def _add_site_records(rows, rollups):
+    serials = pd.to_numeric(read_site_list()['Serial No.'], errors='coerce')
+    last = int(serials.max()) if serials.notna().any() else 0
+    rows = [{**row, "Serial No.": last + i + 1} for i, row in enumerate(rows)]
+    if DATABASE_BACKEND == "sqlite":
+        with sqlite_transaction() as conn:
+            for row in rows:
+                conn.execute("INSERT OR REPLACE INTO sites (serial_no, file_name, site_id, latitude, longitude) VALUES (?, ?, ?, ?, ?)",
+                             [row[col] for col in SITE_LIST_COLUMNS])
+                site_data = _load_site_file(os.path.join(SITE_FILES_FOLDER, row['File Name']), exact=True)
+                _sqlite_write_observations(conn, row['File Name'], site_data)
+                if row['File Name'] not in rollups:
+                    rollups[row['File Name']] = compute_rollups(site_data)
+                _write_rollups(row['File Name'], rollups[row['File Name']], conn)
+    else:
+        # Roll up every file before registering any, so a file that cannot be read is never left in the site list
+        for row in rows:
+            if row['File Name'] not in rollups:
+                rollups[row['File Name']] = compute_rollups(_load_site_file(os.path.join(SITE_FILES_FOLDER, row['File Name']), exact=True))
+        df = read_site_list()
+        save_site_list(pd.concat([df, pd.DataFrame(rows, columns=SITE_LIST_COLUMNS)], ignore_index=True))
+        for row in rows:
+            _write_rollups(row['File Name'], rollups[row['File Name']])
+
+def remove_site_record(file_name):
+    with file_locks(SITE_LIST_LOCK, file_name):
+        if DATABASE_BACKEND == "sqlite":
+            with sqlite_transaction() as conn:
+                conn.execute("DELETE FROM observations WHERE file_name = ?", (file_name,))
+                conn.execute("DELETE FROM rollups WHERE file_name = ?", (file_name,))
+                conn.execute("DELETE FROM sites WHERE file_name = ?", (file_name,))
+        else:
+            df = read_site_list()
+            save_site_list(df[df['File Name'] != file_name])
+            if os.path.exists(os.path.join(ROLLUPS_FOLDER, file_name)):
+                os.remove(os.path.join(ROLLUPS_FOLDER, file_name))
+    invalidate_site_cache(file_name)
+    invalidate_site_index()
+
+def _sqlite_read_observations(file_name, start=None, end=None, columns=None, exact=False):
+    with closing(sqlite_connect()) as conn:
+        row = conn.execute("SELECT columns FROM sites WHERE file_name = ?", (file_name,)).fetchone()
+        if row is None or row[0] is None:
+            raise FileNotFoundError(f"Site file {file_name} is not in the database.")
+        file_columns = json.loads(row[0])
+        selected = ['local_time'] + [col for col in (columns or file_columns) if col != 'local_time' and col in file_columns]
+        query = f"SELECT {_sql_columns(selected)} FROM observations WHERE file_name = ?"
+        params = [file_name]
+        if start is not None:
+            query += " AND local_time >= ?"
+            params.append(start.strftime(SQLITE_TIME_FORMAT))
+        if end is not None:
+            query += " AND local_time <= ?"
+            params.append(end.strftime(SQLITE_TIME_FORMAT))
+        df = pd.read_sql_query(query + " ORDER BY rowid", conn, params=params)
+    df['local_time'] = pd.to_datetime(df['local_time'], format=SQLITE_TIME_FORMAT)
+    return apply_site_schema(df[[col for col in file_columns if col in selected]], exact)
+
+def _load_site_file(path, exact=False):
+    df = pd.read_csv(path)
+    return apply_site_schema(df.drop(columns=[col for col in df.columns if col.startswith('Unnamed:')]), exact)
+
+def _read_site_data(file_name, exact=False):
+    if DATABASE_BACKEND == "sqlite":
+        return _sqlite_read_observations(file_name, exact=exact)
+    return _load_site_file(os.path.join(SITE_FILES_FOLDER, file_name), exact)
+
+# Parsed site data shared by every view. Entries are keyed by file and its modification time
+# (the database file's on the SQLite backend) and evicted least recently used first.
+SITE_CACHE_BUDGET_MB = int(os.environ.get("NGROS_CACHE_MB", 512))
+_site_cache = OrderedDict()
+_site_cache_bytes = 0
+_site_cache_stats = {'hits': 0, 'misses': 0, 'evictions': 0}
+_site_cache_lock = threading.Lock()
+
+def _site_data_version(file_name):
+    path = SQLITE_DB_FILE if DATABASE_BACKEND == "sqlite" else os.path.join(SITE_FILES_FOLDER, file_name)
+    return os.stat(path).st_mtime_ns
+
+def _cached_site_data(file_name):
+    # The returned DataFrame is shared: callers must copy it before modifying
+    global _site_cache_bytes
+    key = (DATABASE_BACKEND, file_name)
+    version = _site_data_version(file_name)
+    with _site_cache_lock:
+        entry = _site_cache.get(key)
+        if entry is not None and entry[0] == version:
+            _site_cache.move_to_end(key)
+            _site_cache_stats['hits'] += 1
+            return entry[1]
+        _site_cache_stats['misses'] += 1
+
+    df = _read_site_data(file_name)
+    nbytes = int(df.memory_usage(deep=True).sum())
+    budget = SITE_CACHE_BUDGET_MB * 1024**2
+    with _site_cache_lock:
+        old_entry = _site_cache.pop(key, None)
+        if old_entry is not None:
+            _site_cache_bytes -= old_entry[2]
+        if nbytes <= budget:
+            _site_cache[key] = (version, df, nbytes)
+            _site_cache_bytes += nbytes
+            while _site_cache_bytes > budget:
+                _, (_, _, evicted_bytes) = _site_cache.popitem(last=False)
+                _site_cache_bytes -= evicted_bytes
+                _site_cache_stats['evictions'] += 1
+    return df
+
+def invalidate_site_cache(file_name=None):
+    # Drop the cached data of one site file, or of every file when file_name is None
+    global _site_cache_bytes
+    with _site_cache_lock:
+        for key in [key for key in _site_cache if file_name is None or key[1] == file_name]:
+            _site_cache_bytes -= _site_cache.pop(key)[2]
+
+def site_cache_stats():
+    with _site_cache_lock:
+        return dict(_site_cache_stats, entries=len(_site_cache), megabytes=round(_site_cache_bytes / 1024**2, 1),
+                    budget_megabytes=SITE_CACHE_BUDGET_MB)
+
+def site_cache_summary():
+    stats = site_cache_stats()
+    lookups = stats['hits'] + stats['misses']
+    hit_rate = f" ({stats['hits'] / lookups:.0%})" if lookups else ""
+    return (f"Site cache: {stats['entries']} files, {stats['megabytes']} of {stats['budget_megabytes']} MB, "
+            f"{stats['hits']} hits{hit_rate}, {stats['misses']} misses, {stats['evictions']} evictions")
+
+def query_site_series(file_name, start=None, end=None, columns=None, max_points=None):
+    # Rows of one site file with start <= local_time <= end (either bound may be None).
+    # columns limits the returned measurement columns; local_time is always included.
+    # With max_points, the coarsest rollup level that still gives that many points over the span is
+    # returned instead (period means, with the level in df.attrs['rollup']) when one is coarse enough.
+    if isinstance(start, str):
+        start = parse_date(start)
+    if isinstance(end, str):
+        end = parse_date(end)
+
+    if max_points is not None:
+        level = choose_rollup_level(file_name, start, end, max_points)
+        if level is not None:
+            return rollup_series(file_name, level, start, end, columns)
+
+    if DATABASE_BACKEND == "sqlite" and (start is not None or end is not None):
+        # Range queries use the (file_name, local_time) index instead of the whole file
+        return _sqlite_read_observations(file_name, start, end, columns)
+
+    df = _cached_site_data(file_name)
+    if columns is not None:
+        df = df[[col for col in df.columns if col == 'local_time' or col in columns]]
+    if start is not None:
+        df = df[df['local_time'] >= start]
+    if end is not None:
+        df = df[df['local_time'] <= end]
+    return df.copy()
+
+def read_site_data(file_name, exact=False):
+    # exact: read the stored values uncached and unconverted, for a read-modify-write or an export
+    if exact:
+        return _read_site_data(file_name, exact=True)
+    return query_site_series(file_name)
+
+def write_site_data(file_name, df, changed_times=None):
+    # changed_times: local_time values whose rows changed, so only their rollup periods are recomputed.
+    # Callers doing a read-modify-write should hold file_lock(file_name) from the read onwards.
+    with file_lock(file_name):
+        rollups = update_rollups(file_name, df, changed_times)
+        if DATABASE_BACKEND == "sqlite":
+            with sqlite_transaction() as conn:
+                _sqlite_write_observations(conn, file_name, df)
+                _write_rollups(file_name, rollups, conn)
+        else:
+            # Temporary file then rename, so readers never see a half-written site file
+            path = os.path.join(SITE_FILES_FOLDER, file_name)
+            df.to_csv(f"{path}.tmp", index=False)
+            os.replace(f"{path}.tmp", path)
+            _write_rollups(file_name, rollups)
+    invalidate_site_cache(file_name)
+
+def import_csv_layout():
+    # Load site_list.csv and every site file into SQLite in one transaction
+    site_df = pd.read_csv(SITE_LIST_FILE)
+    with sqlite_transaction() as conn:
+        for _, row in site_df.iterrows():
+            conn.execute("INSERT OR REPLACE INTO sites (serial_no, file_name, site_id, latitude, longitude) VALUES (?, ?, ?, ?, ?)",
+                         [row[col] for col in SITE_LIST_COLUMNS])
+            site_data = _load_site_file(os.path.join(SITE_FILES_FOLDER, row['File Name']), exact=True)
+            _sqlite_write_observations(conn, row['File Name'], site_data)
+            _write_rollups(row['File Name'], compute_rollups(site_data), conn)
+    invalidate_site_cache()
+    invalidate_site_index()
+    return len(site_df)
+
+def export_csv_layout(destination):
+    # Write the SQLite contents as <destination>/site_list.csv and <destination>/site_files/*.csv
+    os.makedirs(os.path.join(destination, "site_files"), exist_ok=True)
+    with closing(sqlite_connect()) as conn:
+        site_df = pd.read_sql_query('SELECT serial_no AS "Serial No.", file_name AS "File Name", site_id AS "Site ID", '
+                                    'latitude AS "Latitude", longitude AS "Longitude", columns FROM sites ORDER BY serial_no', conn)
+        for _, row in site_df.iterrows():
+            df = pd.read_sql_query(f"SELECT {_sql_columns(json.loads(row['columns']))} FROM observations "
+                                   "WHERE file_name = ? ORDER BY rowid", conn, params=[row['File Name']])
+            df.to_csv(os.path.join(destination, "site_files", row['File Name']), index=False)
+    site_df[SITE_LIST_COLUMNS].to_csv(os.path.join(destination, "site_list.csv"), index=False)
+    return len(site_df)
+
+def compute_rollups(df, periods=None):
+    # Long-format rollups (ROLLUP_COLUMNS) of every numeric column of a site DataFrame at every level.
+    # periods: optional {level: period starts} to compute only those periods.
+    return finish_rollups(rollup_partials(df, periods))
+
+def rollup_partials(df, periods=None):
+    # Per (level, period, parameter) total, min, max and count of df. Partials of consecutive blocks of a
+    # file combine exactly with finish_rollups, so a file can be rolled up without loading it whole.
+    values = {col: exact_float64(df[col]) for col in df.columns
+              if col != 'local_time' and pd.api.types.is_numeric_dtype(df[col])}
+    frames = []
+    for level, (freq, _) in ROLLUP_LEVELS.items():
+        period = df['local_time'].dt.to_period(freq).dt.start_time
+        selected = np.ones(len(df), dtype=bool) if periods is None else period.isin(periods[level]).to_numpy()
+        if not selected.any():
+            continue
+        for param, param_values in values.items():
+            grouped = param_values[selected].groupby(period[selected].values)
+            stats = pd.DataFrame({'total': grouped.sum(), 'min': grouped.min(), 'max': grouped.max(), 'count': grouped.count()})
+            frames.append(stats.rename_axis('period').reset_index().assign(level=level, parameter=param))
+    if not frames:
+        return _empty_rollups(['level', 'period', 'parameter', 'total', 'min', 'max', 'count'])
+    return pd.concat(frames, ignore_index=True)
+
+def _empty_rollups(columns):
+    # Typed like a non-empty frame, so period keeps its .dt accessor for a site file without rows
+    dtypes = {'level': object, 'parameter': object, 'period': 'datetime64[ns]', 'count': np.int64}
+    return pd.DataFrame({col: pd.Series(dtype=dtypes.get(col, 'float64')) for col in columns})
+
+def finish_rollups(partials):
+    if partials.empty:
+        return _empty_rollups(ROLLUP_COLUMNS)
+    rollups = partials.groupby(['level', 'period', 'parameter'], sort=False).agg(
+        total=('total', 'sum'), min=('min', 'min'), max=('max', 'max'), count=('count', 'sum')).reset_index()
+    has_values = rollups['count'] > 0
+    rollups['mean'] = rollups['total'].where(has_values) / rollups['count']
+    rollups['sum'] = rollups['total'].where(has_values & rollups['parameter'].isin(ROLLUP_SUM_PARAMETERS))
+    return rollups[ROLLUP_COLUMNS]
+
+def _rollup_periods(times):
+    # {level: period starts} of every period containing one of times
+    times = pd.Series(pd.to_datetime(pd.Series(times).unique()))
+    return {level: set(times.dt.to_period(freq).dt.start_time) for level, (freq, _) in ROLLUP_LEVELS.items()}
+
+def _replace_rollup_periods(existing, periods, recomputed):
+    stale = np.zeros(len(existing), dtype=bool)
+    for level, starts in periods.items():
+        stale |= (existing['level'] == level).to_numpy() & existing['period'].isin(starts).to_numpy()
+    return pd.concat([existing[~stale], recomputed], ignore_index=True)
+
+def update_rollups(file_name, df, changed_times=None):
+    # Rollups after a write of df: the periods containing changed_times are recomputed from df and the
+    # stored rollups are kept for every other period. Without changed_times everything is recomputed.
+    existing = read_rollups(file_name) if changed_times is not None else None
+    if existing is None:
+        return compute_rollups(df)
+    periods = _rollup_periods(changed_times)
+    return _replace_rollup_periods(existing, periods, compute_rollups(df, periods))
+
+def read_rollups(file_name, level=None):
+    # Stored rollups of a site file, or None if none have been built yet
+    if DATABASE_BACKEND == "sqlite":
+        query = f"SELECT {_sql_columns(ROLLUP_COLUMNS)} FROM rollups WHERE file_name = ?"
+        params = [file_name]
+        if level is not None:
+            query += " AND level = ?"
+            params.append(level)
+        with closing(sqlite_connect()) as conn:
+            rollups = pd.read_sql_query(query + " ORDER BY rowid", conn, params=params)
+        rollups['period'] = pd.to_datetime(rollups['period'], format=SQLITE_TIME_FORMAT)
+    else:
+        path = os.path.join(ROLLUPS_FOLDER, file_name)
+        if not os.path.exists(path):
+            return None
+        rollups = pd.read_csv(path, parse_dates=['period'])
+        if level is not None:
+            rollups = rollups[rollups['level'] == level]
+    return None if rollups.empty else rollups
+
+def _write_rollups(file_name, rollups, conn=None):
+    # conn: open SQLite transaction to write in; the CSV backend writes a temporary file and renames it
+    if DATABASE_BACKEND == "sqlite":
+        records = rollups.assign(period=rollups['period'].dt.strftime(SQLITE_TIME_FORMAT))
+        records = records.astype(object).where(records.notna(), None)
+        conn.execute("DELETE FROM rollups WHERE file_name = ?", (file_name,))
+        conn.executemany(f"INSERT INTO rollups (file_name, {_sql_columns(ROLLUP_COLUMNS)}) VALUES (?{', ?' * len(ROLLUP_COLUMNS)})",
+                         [(file_name, *values) for values in records[ROLLUP_COLUMNS].itertuples(index=False, name=None)])
+    else:
+        path = os.path.join(ROLLUPS_FOLDER, file_name)
+        rollups.to_csv(f"{path}.tmp", index=False)
+        os.replace(f"{path}.tmp", path)
+
+def get_rollups(file_name, level=None):
+    # Like read_rollups, but builds and stores the rollups of files added before rollups existed
+    rollups = read_rollups(file_name, level)
+    if rollups is None:
+        with file_lock(file_name):
+            all_rollups = compute_rollups(read_site_data(file_name, exact=True))
+            if DATABASE_BACKEND == "sqlite":
+                with sqlite_transaction() as conn:
+                    _write_rollups(file_name, all_rollups, conn)
+            else:
+                _write_rollups(file_name, all_rollups)
+        rollups = all_rollups if level is None else all_rollups[all_rollups['level'] == level]
+    return rollups
+
+def choose_rollup_level(file_name, start=None, end=None, max_points=MAX_PLOT_POINTS):
+    # Coarsest level whose periods are no longer than span / max_points, or None if raw rows are needed
+    daily = get_rollups(file_name, 'daily')
+    if daily is None or daily.empty:
+        return None
+    span = (end or daily['period'].max() + pd.Timedelta(days=1)) - (start or daily['period'].min())
+    resolution = span / max_points
+    chosen = None
+    for level, (_, length) in ROLLUP_LEVELS.items():
+        if length <= resolution:
+            chosen = level
+    return chosen
+
+def rollup_series(file_name, level, start=None, end=None, columns=None):
+    # Period means of one rollup level in the same wide layout as query_site_series
+    rollups = get_rollups(file_name, level)
+    freq = ROLLUP_LEVELS[level][0]
+    if start is not None:
+        rollups = rollups[rollups['period'] >= pd.Timestamp(start).to_period(freq).start_time]
+    if end is not None:
+        rollups = rollups[rollups['period'] <= end]
+    if columns is not None:
+        rollups = rollups[rollups['parameter'].isin(columns)]
+    df = rollups.pivot(index='period', columns='parameter', values='mean').rename_axis(columns=None)
+    df = df.rename_axis('local_time').reset_index()
+    df.attrs['rollup'] = level
+    return df
+
+def file_averages(file_name):
+    # Whole-file mean of every parameter, from the monthly rollups (count-weighted)
+    monthly = get_rollups(file_name, 'monthly')
+    if monthly is None:
+        return {}
+    weighted = monthly.assign(total=monthly['mean'] * monthly['count']).groupby('parameter', sort=False)[['total', 'count']].sum()
+    return {param: round(row['total'] / row['count'], 3) if row['count'] else np.nan for param, row in weighted.iterrows()}
+
+# Write locks and jobs. Every read-modify-write of a site file or the site list holds an advisory lock
+# named after it (LOCKS_FOLDER/<name>.lock): a per-name RLock serializes threads in this process and an
+# OS file lock serializes other processes (a second GUI, command line runs). Locks are re-entrant within
+# a thread, and several locks are always taken in sorted order so that two writers cannot deadlock.
+# They are held only around the read-merge-write itself, never across network fetches, so a view that
+# needs a lock briefly (e.g. to build missing rollups) never waits for a download.
+SITE_LIST_LOCK = "site_list"
+SQLITE_WRITE_LOCK = "sqlite"  # taken last, inside sqlite_transaction, after any site file or site list lock
+JOB_WORKERS = int(os.environ.get("NGROS_JOB_WORKERS", 4))
+JOB_HISTORY = 20
+JOB_FAILURE_SECONDS = 60  # failed jobs stay in the status line this long
+
+_file_locks = defaultdict(threading.RLock)
+_file_lock_handles = {}  # name -> [depth, open lock file]; only touched by the thread holding the RLock
+_file_locks_guard = threading.Lock()
+
+def _lock_os_file(fh):
+    if os.name == 'nt':
+        import msvcrt
+        fh.seek(0)
+        while True:
+            try:
+                msvcrt.locking(fh.fileno(), msvcrt.LK_LOCK, 1)
+                return
+            except OSError:  # LK_LOCK gives up after about 10 s; keep waiting like flock does
+                continue
+    else:
+        import fcntl
+        fcntl.flock(fh.fileno(), fcntl.LOCK_EX)
+
+def _unlock_os_file(fh):
+    if os.name == 'nt':
+        import msvcrt
+        fh.seek(0)
+        msvcrt.locking(fh.fileno(), msvcrt.LK_UNLCK, 1)
+    else:
+        import fcntl
+        fcntl.flock(fh.fileno(), fcntl.LOCK_UN)
+
+@contextmanager
+def file_lock(name):
+    with _file_locks_guard:
+        lock = _file_locks[name]
+    with lock:
+        handle = _file_lock_handles.setdefault(name, [0, None])
+        if handle[0] == 0:
+            handle[1] = open(os.path.join(LOCKS_FOLDER, f"{name}.lock"), 'a+')
+            try:
+                _lock_os_file(handle[1])
+            except BaseException:
+                handle[1].close()
+                raise
+        handle[0] += 1
+        try:
+            yield
+        finally:
+            handle[0] -= 1
+            if handle[0] == 0:
+                _unlock_os_file(handle[1])
+                handle[1].close()
+                handle[1] = None
+
+@contextmanager
+def file_locks(*names):
+    with ExitStack() as stack:
+        for name in sorted(set(names)):
+            stack.enter_context(file_lock(name))
+        yield
+
+# Jobs that write to the database run on a small thread pool. A job names the files it writes; queued jobs
+# start oldest first as soon as none of those names is used by a running or earlier queued job, so jobs on
+# one file run one after another while updates of different files run side by side. The job itself takes
+# the file locks only around its writes. Submitting a job that is already
+# queued or running (same kind and target) returns the existing job instead of starting a second one.
+_jobs = OrderedDict()  # job id -> job dict, in submission order
+_jobs_lock = threading.Lock()
+_job_ids = itertools.count(1)
+_job_executor = None
+
+def submit_job(kind, target, fn, *args, locks=()):
+    # Runs fn(*args, job=job) once the locks are free. Returns (job, created); created is False when an
+    # identical job was already in flight.
+    global _job_executor
+    with _jobs_lock:
+        for job in _jobs.values():
+            if job['kind'] == kind and job['target'] == target and job['state'] in ('queued', 'running'):
+                return job, False
+        if _job_executor is None:
+            _job_executor = ThreadPoolExecutor(max_workers=JOB_WORKERS, thread_name_prefix="ngros-job")
+        job = {'id': next(_job_ids), 'kind': kind, 'target': target, 'locks': frozenset(locks),
+               'fn': fn, 'args': args, 'state': 'queued', 'status': "", 'progress': None, 'error': None,
+               'reported': False, 'submitted': time.time(), 'started': None, 'finished': None, 'done': threading.Event()}
+        _jobs[job['id']] = job
+        _dispatch_jobs()
+    return job, True
+
+def _dispatch_jobs():
+    # Called with _jobs_lock held
+    running = sum(job['state'] == 'running' for job in _jobs.values())
+    claimed = set()
+    for job in _jobs.values():
+        if job['state'] == 'running':
+            claimed |= job['locks']
+    for job in _jobs.values():
+        if job['state'] != 'queued':
+            continue
+        if running < JOB_WORKERS and not job['locks'] & claimed:
+            job['state'] = 'running'
+            job['started'] = time.time()
+            running += 1
+            _job_executor.submit(_run_job, job)
+        claimed |= job['locks']  # later jobs wait behind this one for the same locks
+
+    finished = [job_id for job_id, job in _jobs.items() if job['state'] in ('done', 'failed')]
+    for job_id in finished[:max(0, len(finished) - JOB_HISTORY)]:
+        del _jobs[job_id]
+
+def _run_job(job):
+    try:
+        job['fn'](*job['args'], job=job)
+        job['state'] = 'done'
+    except Exception as e:
+        traceback.print_exc()
+        job['state'] = 'failed'
+        job['error'] = str(e) or type(e).__name__
+    finally:
+        job['finished'] = time.time()
+        job['done'].set()
+        with _jobs_lock:
+            _dispatch_jobs()
+
+def set_job_status(job, status=None, progress=None):
+    if job is None:
+        return
+    if status is not None:
+        job['status'] = status
+    if progress is not None:
+        job['progress'] = progress
+
+def list_jobs():
+    with _jobs_lock:
+        return [{key: job[key] for key in ('id', 'kind', 'target', 'state', 'status', 'progress', 'error', 'finished')}
+                for job in _jobs.values()]
+
+def take_job_failures():
+    # Failed jobs not returned by an earlier call, so that each failure is reported once
+    with _jobs_lock:
+        failed = [job for job in _jobs.values() if job['state'] == 'failed' and not job['reported']]
+        for job in failed:
+            job['reported'] = True
+        return [{key: job[key] for key in ('id', 'kind', 'target', 'error')} for job in failed]
+
+def job_summary():
+    now = time.time()
+    shown = [job for job in list_jobs() if job['state'] in ('queued', 'running')
+             or (job['state'] == 'failed' and now - job['finished'] < JOB_FAILURE_SECONDS)]
+    if not shown:
+        return "No jobs running."
+    parts = []
+    for job in shown:
+        if job['state'] == 'failed':
+            parts.append(f"{job['kind']} {job['target']} (failed: {job['error']})")
+            continue
+        progress = f" {job['progress']:.0f}%" if job['state'] == 'running' and job['progress'] is not None else ""
+        parts.append(f"{job['kind']} {job['target']} ({job['state']}{progress})")
+    return "Jobs: " + ", ".join(parts)
+
+# Parallel scans: map a per-file read-and-reduce function over site files on a pool of worker processes.
+# Workers are spawned (not forked, so the GUI's threads and locks are never copied into them) by the first
+# scan that needs them, kept for later scans, and do not cache site data. Results come back in input order whatever the worker count.
+# Scans are for reductions that send little back (averages, column lists, aggregates); views that need
+# whole series read them in this process through the shared site cache.
+SCAN_SERIAL_FILES = 4  # fewer files than this are scanned in this process
+# Default pool size. Each worker is a full interpreter with pandas loaded, and the GUI's scans are small,
+# so the pool is capped; the aggregate command uses every CPU unless told otherwise.
+SCAN_WORKERS = int(os.environ.get("NGROS_SCAN_WORKERS", min(os.cpu_count() or 1, 4)))
+_scan_executor = None
+_scan_workers = None
+_scan_executor_lock = threading.Lock()
+
+def _scan_worker_init():
+    global SITE_CACHE_BUDGET_MB
+    SITE_CACHE_BUDGET_MB = 0
+
+def _scan_file(fn, file_name):
+    try:
+        return fn(file_name), None
+    except Exception as e:
+        return None, str(e)
+
+def parallel_scan(file_names, fn, max_workers=None, chunksize=None):
+    # Returns [(fn(file_name), None) or (None, error message)] in the order of file_names. fn must be a
+    # top-level function (or a functools.partial of one) so that it can be sent to the workers.
+    file_names = list(file_names)
+    max_workers = max_workers or SCAN_WORKERS
+    scan = functools.partial(_scan_file, fn)
+    if max_workers == 1 or len(file_names) < SCAN_SERIAL_FILES:
+        return [scan(file_name) for file_name in file_names]
+
+    if chunksize is None:
+        # About four chunks per worker: few enough round trips, small enough to balance uneven files
+        chunksize = max(1, len(file_names) // (max_workers * 4))
+    return list(_get_scan_executor(max_workers).map(scan, file_names, chunksize=chunksize))
+
+def _get_scan_executor(max_workers):
+    global _scan_executor, _scan_workers
+    with _scan_executor_lock:
+        if _scan_executor is None or _scan_workers != max_workers:
+            if _scan_executor is not None:
+                _scan_executor.shutdown()
+            _scan_executor = ProcessPoolExecutor(max_workers=max_workers, mp_context=multiprocessing.get_context("spawn"),
+                                                 initializer=_scan_worker_init)
+            _scan_workers = max_workers
+        return _scan_executor
+
+def site_file_columns(file_name):
+    # Column names of a site file without loading its rows; empty if the file has no data
+    if DATABASE_BACKEND == "sqlite":
+        with closing(sqlite_connect()) as conn:
+            row = conn.execute("SELECT columns FROM sites WHERE file_name = ?", (file_name,)).fetchone()
+            has_rows = conn.execute("SELECT 1 FROM observations WHERE file_name = ? LIMIT 1", (file_name,)).fetchone()
+        return json.loads(row[0]) if row and row[0] and has_rows else []
+    head = pd.read_csv(os.path.join(SITE_FILES_FOLDER, file_name), nrows=1)
+    return [] if head.empty else [col for col in head.columns if not col.startswith('Unnamed:')]
+
+def summarize_site_data(df):
+    # Per-parameter count, mean, M2 (sum of squared deviations from the mean), min and max of a site
+    # DataFrame. Summaries of several files combine with combine_summaries without losing precision.
+    values = pd.DataFrame({col: exact_float64(df[col]) for col in df.columns
+                           if col != 'local_time' and pd.api.types.is_numeric_dtype(df[col])})
+    mean = values.mean()
+    return pd.DataFrame({'count': values.count(), 'mean': mean, 'm2': ((values - mean) ** 2).sum(),
+                         'min': values.min(), 'max': values.max()}).rename_axis('parameter').reset_index()
+
+def summarize_site_file(file_name, start=None, end=None):
+    return summarize_site_data(query_site_series(file_name, start, end))
+
+def _summarize_csv_path(path):
+    return summarize_site_data(_load_site_file(path, exact=True))
+
+def combine_summaries(summaries):
+    # Pairwise (Chan et al.) merge of count, mean and M2, in the order given, so the result does not depend
+    # on which worker finished first
+    stats = {}  # parameter -> [files, count, mean, m2, min, max]
+    for summary in summaries:
+        if summary is None:
+            continue
+        for row in summary.itertuples(index=False):
+            if row.count == 0:
+                stats.setdefault(row.parameter, [0, 0, np.nan, 0.0, np.nan, np.nan])
+                continue
+            if row.parameter not in stats or stats[row.parameter][1] == 0:
+                stats[row.parameter] = [1, row.count, row.mean, row.m2, row.min, row.max]
+                continue
+            files, count, mean, m2, low, high = stats[row.parameter]
+            total = count + row.count
+            delta = row.mean - mean
+            stats[row.parameter] = [files + 1, total, mean + delta * row.count / total,
+                                    m2 + row.m2 + delta ** 2 * count * row.count / total,
+                                    np.fmin(low, row.min), np.fmax(high, row.max)]
+    return pd.DataFrame([{'parameter': parameter, 'files': files, 'count': count, 'mean': mean,
+                          'std': np.sqrt(m2 / (count - 1)) if count > 1 else np.nan, 'min': low, 'max': high}
+                         for parameter, (files, count, mean, m2, low, high) in stats.items()],
+                        columns=['parameter', 'files', 'count', 'mean', 'std', 'min', 'max'])
+
+def aggregate_sites(file_names, start=None, end=None, max_workers=None):
+    # Statistics of every parameter over the given site files (optionally within start..end).
+    # Returns (statistics, [(file name, error)] for the files that could not be read).
+    file_names = list(file_names)
+    results = parallel_scan(file_names, functools.partial(summarize_site_file, start=start, end=end), max_workers)
+    errors = [(file_name, error) for file_name, (_, error) in zip(file_names, results) if error]
+    return combine_summaries([summary for summary, _ in results]), errors
+
+# Spatial index over the site list. Sites are indexed as unit vectors so that KD-tree chord distances
+# map directly to great-circle distances; the index is rebuilt on first use after a site is added or removed.
+EARTH_RADIUS_KM = 6371.0088
+site_filter_query = None  # text of the active site query, or None to show every site
+_site_index = None
+_site_index_lock = threading.Lock()
+_boundary_gdf = None
+
+def _unit_vectors(lat, lon):
+    lat, lon = np.radians(lat), np.radians(lon)
+    return np.column_stack([np.cos(lat) * np.cos(lon), np.cos(lat) * np.sin(lon), np.sin(lat)])
+
+def get_site_index():
+    global _site_index
+    from scipy.spatial import cKDTree
+    with _site_index_lock:
+        if _site_index is None:
+            sites = read_site_list().reset_index(drop=True)
+            lat = pd.to_numeric(sites['Latitude'], errors='coerce').to_numpy(dtype=float)
+            lon = pd.to_numeric(sites['Longitude'], errors='coerce').to_numpy(dtype=float)
+            valid = np.isfinite(lat) & np.isfinite(lon)
+            sites, lat, lon = sites[valid].reset_index(drop=True), lat[valid], lon[valid]
+            _site_index = {'sites': sites, 'lat': lat, 'lon': lon, 'tree': cKDTree(_unit_vectors(lat, lon))}
+        return _site_index
+
+def invalidate_site_index():
+    global _site_index
+    with _site_index_lock:
+        _site_index = None
+
+def sites_in_bbox(min_lon, min_lat, max_lon, max_lat):
+    index = get_site_index()
+    mask = (index['lon'] >= min_lon) & (index['lon'] <= max_lon) & (index['lat'] >= min_lat) & (index['lat'] <= max_lat)
+    return index['sites'][mask]
+
+def sites_within_radius(lat, lon, radius_km):
+    index = get_site_index()
+    chord = 2 * np.sin(min(radius_km / EARTH_RADIUS_KM, np.pi) / 2)
+    matches = index['tree'].query_ball_point(_unit_vectors([lat], [lon])[0], chord)
+    return index['sites'].iloc[sorted(matches)]
+
+def nearest_sites(lat, lon, k=5):
+    index = get_site_index()
+    k = min(k, len(index['sites']))
+    if k == 0:
+        return index['sites'].assign(**{'Distance (km)': []})
+    chords, matches = index['tree'].query(_unit_vectors([lat], [lon])[0], k=k)
+    distances = 2 * EARTH_RADIUS_KM * np.arcsin(np.clip(np.atleast_1d(chords) / 2, 0, 1))
+    return index['sites'].iloc[np.atleast_1d(matches)].assign(**{'Distance (km)': distances.round(3)})
+
+def region_polygon(name):
+    # Union of the boundary shapefile features that have name in any text column (case-insensitive)
+    global _boundary_gdf
+    import geopandas as gpd
+    if _boundary_gdf is None:
+        _boundary_gdf = gpd.read_file(SHP_PATH)
+    text_columns = [col for col in _boundary_gdf.columns if col != 'geometry' and not pd.api.types.is_numeric_dtype(_boundary_gdf[col])]
+    mask = np.zeros(len(_boundary_gdf), dtype=bool)
+    for col in text_columns:
+        mask |= _boundary_gdf[col].astype(str).str.casefold() == name.casefold()
+    if not mask.any():
+        raise ValueError(f"No region named '{name}' in {SHP_PATH}.")
+    return _boundary_gdf[mask].geometry.union_all()
+
+def sites_in_polygon(polygon):
+    import shapely
+    index = get_site_index()
+    min_lon, min_lat, max_lon, max_lat = polygon.bounds
+    candidates = np.flatnonzero((index['lon'] >= min_lon) & (index['lon'] <= max_lon) &
+                                (index['lat'] >= min_lat) & (index['lat'] <= max_lat))
+    shapely.prepare(polygon)
+    inside = shapely.contains_xy(polygon, index['lon'][candidates], index['lat'][candidates])
+    return index['sites'].iloc[candidates[inside]]
+
+def query_sites(query):
+    # Text form used by the GUI filter and the command line:
+    #   bbox:MIN_LON,MIN_LAT,MAX_LON,MAX_LAT | radius:LAT,LON,KM | nearest:LAT,LON[,K] | region:NAME
+    kind, _, args = query.partition(':')
+    kind = kind.strip().lower()
+    if kind == 'region':
+        return sites_in_polygon(region_polygon(args.strip()))
+    try:
+        values = [float(value) for value in args.split(',')]
+    except ValueError:
+        raise ValueError(f"Invalid numbers in site query '{query}'.")
+    if kind == 'bbox' and len(values) == 4:
+        return sites_in_bbox(*values)
+    if kind == 'radius' and len(values) == 3:
+        return sites_within_radius(*values)
+    if kind == 'nearest' and len(values) in (2, 3):
+        return nearest_sites(values[0], values[1], int(values[2]) if len(values) == 3 else 5)
+    raise ValueError(f"Unrecognised site query '{query}'. Use bbox:MIN_LON,MIN_LAT,MAX_LON,MAX_LAT, "
+                     "radius:LAT,LON,KM, nearest:LAT,LON[,K] or region:NAME.")
+
+def site_filter_files():
+    # File Names matched by the active site query, or None without one. The query is run again on every
+    # call, so sites added or removed since it was applied are picked up.
+    if site_filter_query is None:
+        return None
+    return set(query_sites(site_filter_query)['File Name'])
+
+def filter_sites(df):
+    # Restrict a site list DataFrame to the active site query
+    matched = site_filter_files()
+    if matched is None:
+        return df
+    return df[df['File Name'].isin(matched)]
+
 def fetch_api_data(api_url):
     try:
         response = requests.get(api_url)
@@ -61,48 +961,20 @@ def fetch_api_data(api_url):
         print(f"Error fetching data from API: {e}")
         return None
 
-# Define the function to fetch and update data
-def fetch_and_update_data(selected_file, progress_var, status_label, gui_queue):
-    # Path to the site file
-    site_file_path = os.path.join(SITE_FILES_FOLDER, selected_file)
-    
-    if not os.path.exists(site_file_path):
-        gui_queue.put((status_label, f"File {selected_file} not found."))
-        return
+def _date_keys(local_time):
+    # YYYYMMDD integers of a datetime Series (much faster than strftime on large files)
+    return (local_time.dt.year * 10000 + local_time.dt.month * 100 + local_time.dt.day).to_numpy(dtype=np.int64)
 
-    site_data_df = pd.read_csv(site_file_path)
-    
-    # Read the site list CSV to get coordinates
-    site_list_path = SITE_LIST_FILE
-    site_df = pd.read_csv(site_list_path)
-    
-    # Extract site information
-    site_name = os.path.basename(selected_file)
-    gui_queue.put((status_label, f"Processing site: {site_name}"))
-    site_info = site_df[site_df['File Name'] == site_name]
-    
-    if site_info.empty:
-        gui_queue.put((status_label, f"Coordinates for site {site_name} not found."))
-        return
-    
-    latitude = site_info.iloc[0]['Latitude']
-    longitude = site_info.iloc[0]['Longitude']
-    
-    # Ensure date and hour columns are extracted from local_time
-    #site_data_df['local_time'] = pd.to_datetime(site_data_df['local_time'])
-    site_data_df['local_time'] = site_data_df['local_time'].apply(parse_date)
-    site_data_df['date'] = site_data_df['local_time'].dt.strftime("%Y%m%d")
-    site_data_df['hour'] = site_data_df['local_time'].dt.hour
-    
-    unique_dates = site_data_df['date'].unique()
-    
+def fetch_power_data(dates, latitude, longitude, site_name, progress_var, status_label, gui_queue, job=None):
+    # Hourly POWER_PARAMETERS for each date (YYYYMMDD integers), one request per date.
+    # Returns one row per fetched (date, hour) with columns date, hour and POWER_PARAMETERS.
     gui_queue.put((progress_var, 0))
-    total_steps = len(unique_dates)
+    total_steps = len(dates)
     
-    api_responses = []
+    frames = []
     with ThreadPoolExecutor(max_workers=50) as executor:
         future_to_date = {}
-        for date in unique_dates:
+        for date in dates:
             start_day = date
             end_day = date
             api_url = f"https://power.larc.nasa.gov/api/temporal/hourly/point?parameters=PRECTOTCORR,T2M,RH2M,WS2M,ALLSKY_SFC_SW_DWN&community=AG&longitude={longitude}&latitude={latitude}&start={start_day}&end={end_day}&format=CSV"
@@ -113,39 +985,120 @@ def fetch_and_update_data(selected_file, progress_var, status_label, gui_queue):
             date = future_to_date[future]
             response_text = future.result()
             if response_text:
-                api_responses.append((date, response_text))
+                api_data_df = pd.read_csv(StringIO(response_text), skiprows=13)
+                frames.append(api_data_df[['HR'] + POWER_PARAMETERS].rename(columns={'HR': 'hour'}).assign(date=date))
             else:
                 gui_queue.put((status_label, f"Failed to fetch data for {site_name} on {date}"))
             
             # Update progress bar and status label
             gui_queue.put((progress_var, (step + 1) / total_steps * 100))
             gui_queue.put((status_label, f"Fetched data for date: {date} ({step + 1}/{total_steps})"))
+            set_job_status(job, f"Fetched {step + 1}/{total_steps} dates", (step + 1) / total_steps * 100)
+
+    if not frames:
+        return pd.DataFrame(columns=['date', 'hour'] + POWER_PARAMETERS)
+    fetched = pd.concat(frames, ignore_index=True).drop_duplicates(['date', 'hour'])
+    return fetched.astype({'date': np.int64, 'hour': np.int64, **{param: 'float64' for param in POWER_PARAMETERS}})
+
+def merge_power_data(site_data_df, fetched):
+    # Set POWER_PARAMETERS in place on the rows whose local date and hour were fetched, with one
+    # merge-join on (date, hour). Returns the local_time of the updated rows.
+    local_time = site_data_df['local_time']
+    keys = pd.DataFrame({'date': _date_keys(local_time), 'hour': local_time.dt.hour.to_numpy(dtype=np.int64)})
+    matched = keys.merge(fetched, on=['date', 'hour'], how='left', indicator=True)
+    updated = (matched['_merge'] == 'both').to_numpy()
+    for param in POWER_PARAMETERS:
+        if param not in site_data_df.columns:
+            site_data_df[param] = np.nan
+        site_data_df[param] = site_data_df[param].where(~updated, matched[param].to_numpy())
+    return local_time[updated]
+
+# Define the function to fetch and update data
+def fetch_and_update_data(selected_file, progress_var, status_label, gui_queue, job=None, chunked=None):
+    # Read-modify-write of one site file; run it through submit_job with locks=[selected_file].
+    # chunked: stream the file instead of loading it (CSV backend only); by default this is done for
+    # files larger than CHUNKED_UPDATE_MB.
+    if selected_file not in list_site_files():
+        gui_queue.put((status_label, f"File {selected_file} not found."))
+        return
 
-    gui_queue.put((status_label, f"Processing fetched data: Matching hourly records."))
-    # Process the fetched data using a batch update
-    updates = {'PRECTOTCORR': [], 'T2M': [], 'RH2M': [], 'WS2M': [], 'ALLSKY_SFC_SW_DWN': []}
-    for date, response_text in api_responses:
-        api_data_df = pd.read_csv(StringIO(response_text), skiprows=13)
-        api_data_df['date'] = date
-        for hour in range(24):
-            matching_rows = api_data_df[api_data_df['HR'] == hour]
-            if not matching_rows.empty:
-                for param in updates.keys():
-                    updates[param].append((date, hour, matching_rows[param].values[0]))
-
-    for param, values in updates.items():
-        for date, hour, value in values:
-            mask = (site_data_df['date'] == date) & (site_data_df['hour'] == hour)
-            site_data_df.loc[mask, param] = value
-
-    # Save the updated CSV file
-    site_data_df.drop(columns=['date', 'hour'], inplace=True)
-    site_data_df.to_csv(site_file_path, index=False)
+    # Read the site list to get coordinates
+    site_df = read_site_list()
+    
+    # Extract site information
+    site_name = os.path.basename(selected_file)
+    gui_queue.put((status_label, f"Processing site: {site_name}"))
+    site_info = site_df[site_df['File Name'] == site_name]
+    
+    if site_info.empty:
+        gui_queue.put((status_label, f"Coordinates for site {site_name} not found."))
+        return
+    
+    latitude = site_info.iloc[0]['Latitude']
+    longitude = site_info.iloc[0]['Longitude']
+
+    if chunked is None:
+        chunked = DATABASE_BACKEND == "csv" and os.path.getsize(os.path.join(SITE_FILES_FOLDER, selected_file)) > CHUNKED_UPDATE_MB * 1024**2
+    if chunked and DATABASE_BACKEND == "csv":
+        update_site_file_chunked(selected_file, latitude, longitude, progress_var, status_label, gui_queue, job)
+    else:
+        dates = pd.unique(_date_keys(query_site_series(selected_file, columns=[])['local_time']))
+        fetched = fetch_power_data(dates, latitude, longitude, site_name, progress_var, status_label, gui_queue, job)
+
+        gui_queue.put((status_label, f"Processing fetched data: Matching hourly records."))
+        set_job_status(job, "Matching hourly records")
+        # Read again under the lock, so a write made by another process during the fetch is not lost
+        with file_lock(selected_file):
+            site_data_df = read_site_data(selected_file, exact=True)
+            changed_times = merge_power_data(site_data_df, fetched)
+
+            # Save the updated site data (one transaction on the SQLite backend)
+            write_site_data(selected_file, site_data_df, changed_times)
     gui_queue.put((status_label, f"Updated data for {selected_file}"))
     gui_queue.put((progress_var, 100))
     gui_queue.put(('messagebox', "Success", f"Data update for {selected_file} completed successfully."))
     gui_queue.put(('callback', display_table))
-    gui_queue.put(('callback', checkbox_event))
+    gui_queue.put(('callback', lambda: checkbox_event()))  # defined by the GUI; the command line never runs callbacks
+
+def update_site_file_chunked(file_name, latitude, longitude, progress_var, status_label, gui_queue, job=None):
+    # Out-of-core meteorology update of a CSV site file: at most UPDATE_CHUNK_ROWS rows are in memory at once.
+    # A first pass collects the dates to fetch; a second merges the fetched values block by block into a
+    # temporary file, which then replaces the site file. Rollups of the changed periods are combined from
+    # per-block partials.
+    path = os.path.join(SITE_FILES_FOLDER, file_name)
+    tmp_path = f"{path}.tmp"
+    gui_queue.put((status_label, f"Scanning {file_name} for dates"))
+    set_job_status(job, "Scanning for dates")
+    dates = set()
+    for chunk in pd.read_csv(path, usecols=['local_time'], chunksize=UPDATE_CHUNK_ROWS):
+        dates.update(_date_keys(parse_local_time(chunk['local_time'])))
+    fetched = fetch_power_data(sorted(dates), latitude, longitude, file_name, progress_var, status_label, gui_queue, job)
+
+    with file_lock(file_name):
+        existing = read_rollups(file_name)
+        periods = None
+        if existing is not None:
+            periods = _rollup_periods(pd.to_datetime(fetched['date'].astype(str), format="%Y%m%d"))
+        partials = []
+        rows = 0
+        try:
+            for i, chunk in enumerate(pd.read_csv(path, chunksize=UPDATE_CHUNK_ROWS)):
+                chunk = apply_site_schema(chunk.drop(columns=[col for col in chunk.columns if col.startswith('Unnamed:')]), exact=True)
+                merge_power_data(chunk, fetched)
+                chunk.to_csv(tmp_path, mode='w' if i == 0 else 'a', header=i == 0, index=False)
+                partials.append(rollup_partials(chunk, periods))
+                rows += len(chunk)
+                gui_queue.put((status_label, f"Processing fetched data: merged {rows:,} rows"))
+                set_job_status(job, f"Merged {rows:,} rows")
+            recomputed = finish_rollups(pd.concat(partials, ignore_index=True))
+            rollups = recomputed if existing is None else _replace_rollup_periods(existing, periods, recomputed)
+            os.replace(tmp_path, path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+        _write_rollups(file_name, rollups)
+    invalidate_site_cache(file_name)
 
 def gui_update(gui_queue):
     try:
@@ -154,8 +1107,12 @@ def gui_update(gui_queue):
             if isinstance(task, tuple):
                 if task[0] == 'messagebox':
                     messagebox.showinfo(task[1], task[2])
+                elif task[0] == 'error':
+                    messagebox.showerror(task[1], task[2])
                 elif task[0] == 'callback':
                     task[1]()
+                elif task[0] == 'output':
+                    out_text.insert(ctk.END, task[1])
                 else:
                     widget, value = task
                     if isinstance(widget, ttk.Progressbar):
@@ -169,6 +1126,11 @@ def gui_update(gui_queue):
     root.after(100, gui_update, gui_queue)
 
 def on_update(selected_file, input_frame):
+    for job in list_jobs():
+        if job['kind'] == 'update' and job['target'] == selected_file and job['state'] in ('queued', 'running'):
+            messagebox.showinfo("Update in progress", f"An update of {selected_file} is already {job['state']}.")
+            return
+
     # Progress bar and status label
     progress_var = tk.DoubleVar()
     progress_bar = ttk.Progressbar(input_frame, variable=progress_var, maximum=100)
@@ -177,33 +1139,28 @@ def on_update(selected_file, input_frame):
     status_label = Label(input_frame, text="", anchor='w', font=('Calibri', 12))
     status_label.grid(row=7, column=0, columnspan=2, sticky='nsew', padx=5, pady=5)
     
-    gui_queue = queue.Queue()
-    threading.Thread(target=fetch_and_update_data, args=(selected_file, progress_var, status_label, gui_queue)).start()
-    root.after(100, gui_update, gui_queue)
-    
+    submit_job('update', selected_file, fetch_and_update_data, selected_file, progress_var, status_label, gui_queue,
+               locks=[selected_file])
+
+def refresh_job_status():
+    for job in take_job_failures():
+        gui_queue.put(('error', "Error", f"Could not {job['kind']} {job['target']}: {job['error']}"))
+    jobs_label.config(text=job_summary())
+    root.after(500, refresh_job_status)
+
+def refresh_cache_status():
+    cache_label.config(text=site_cache_summary())
+    root.after(2000, refresh_cache_status)
+
 def display_table():
     for widget in display_frame.winfo_children():
         widget.destroy()
 
-    def calculate_averages(df, columns):
-        averages = df[columns].mean().to_dict()
-        rounded_averages = {col: round(avg, 3) for col, avg in averages.items()}
-        return rounded_averages
-
     def process_site_files(entries, site_files_columns):
+        # Averages come from the precomputed monthly rollups rather than a full read of each file
         averages_list = []
-        for entry in entries:
-            file_name = entry['File Name']
-            file_path = os.path.join(SITE_FILES_FOLDER, file_name)
-            df = pd.read_csv(file_path)
-            df = df.drop(columns=['entity_id', 'local_time'])
-            unnamed_columns = [col for col in df.columns if col.startswith('Unnamed:')]
-            if unnamed_columns:
-                # Ensure columns exist in the DataFrame before attempting to drop them
-                unnamed_columns_to_drop = [col for col in unnamed_columns if col in df.columns]
-                df = df.drop(columns=unnamed_columns_to_drop, axis=1)
-                site_files_columns = df.columns
-            averages = calculate_averages(df, site_files_columns)
+        for entry, (averages, error) in zip(entries, parallel_scan([entry['File Name'] for entry in entries], file_averages)):
+            averages = averages or {}
             averages_list.append(averages)
             entry.update(averages)
         return averages_list
@@ -227,8 +1184,7 @@ def display_table():
 
             # Determine all columns dynamically
             base_columns = list(entries[0].keys())
-            temp_df = pd.read_csv(os.path.join(SITE_FILES_FOLDER, table.item(item_id, 'values')[1]))
-            site_files_columns = list(temp_df.drop(columns=['entity_id', 'local_time']).columns)
+            site_files_columns = list(file_averages(table.item(item_id, 'values')[1]).keys())
             #['drip_rate', 'PRECTOTCORR', 'T2M', 'RH2M', 'WS2M', 'ALLSKY_SFC_SW_DWN']
 
             # Process site files to get averages
@@ -281,10 +1237,7 @@ def display_table():
             file_name = treeview.item(selected_item)['values'][1]  # Assuming 'File Name' is the second column
             result_window.title(f"{file_name.split('.')[0]}")
             if file_name:
-                file_path = os.path.join(SITE_FILES_FOLDER, file_name)
-                df = pd.read_csv(file_path)
-                unnamed_columns = [col for col in df.columns if col.startswith('Unnamed:')]
-                df = df.drop(columns=unnamed_columns, axis=1)
+                df = query_site_series(file_name)
     
                 num_rows = len(df.index)
                 count_label = ctk.CTkLabel(result_window, text=f"Showing {num_rows} rows")
@@ -323,7 +1276,7 @@ def display_table():
     parent_y_scrollbar = ttk.Scrollbar(parent_site_frame, orient="vertical")
 
     if os.path.exists(SITE_LIST_FILE):
-        df = pd.read_csv(SITE_LIST_FILE)
+        df = filter_sites(read_site_list())
         columns = list(df.columns)
         site_files_columns = ['drip_rate', 'PRECTOTCORR', 'T2M', 'RH2M', 'WS2M', 'ALLSKY_SFC_SW_DWN']
         all_columns = columns + site_files_columns
@@ -372,6 +1325,9 @@ def on_double_click(event):
     item_values = table.item(item_id, 'values')
     site_name = item_values[1]  # Assuming second column is the File Name
     site_path = os.path.join(SITE_FILES_FOLDER, site_name)
+    if DATABASE_BACKEND == "sqlite" and site_name in list_site_files():
+        # The database holds the current data; refresh the file copy before opening it
+        read_site_data(site_name, exact=True).to_csv(site_path, index=False)
     if os.path.exists(site_path):
         open_site_file(site_path)
     else:
@@ -388,27 +1344,29 @@ def delete_items(event):
             site_name = item_values[1]  # Assuming second column is the File Name
             site_id = item_values[2]
             table.delete(item_id)
-            delete_site_files(site_name, site_id)
+            # Waits for any running update of the file, then removes the file and its site list entry
+            submit_job('delete', site_name, delete_site_files, site_name, site_id, gui_queue,
+                       locks=[SITE_LIST_LOCK, site_name])
 
-def delete_site_files(site_name, site_id):
+def delete_site_files(site_name, site_id, gui_queue, job=None):
     site_file_path = os.path.join(SITE_FILES_FOLDER, site_name)
-    try:
-        os.remove(site_file_path)
-        out_text.insert(ctk.END, f"Deleted file: {site_file_path} with Site ID: [{site_id}]\n")
-    except FileNotFoundError:
-        out_text.insert(ctk.END, f"File not found: {site_file_path}\n")
-    except Exception as e:
-        out_text.insert(ctk.END, f"Error deleting file: {site_file_path}, {e}\n")
-
-    # Remove from site list CSV
-    if os.path.exists(SITE_LIST_FILE):
-        df = pd.read_csv(SITE_LIST_FILE)
-        df = df[df['File Name'] != site_name]
-        df.to_csv(SITE_LIST_FILE, index=False)
-        out_text.insert(ctk.END, f"Deleted Site ID: {site_id}\n")
-
-    load_site_list()
-    checkbox_event()
+    with file_locks(SITE_LIST_LOCK, site_name):
+        try:
+            os.remove(site_file_path)
+            invalidate_site_cache(site_name)
+            gui_queue.put(('output', f"Deleted file: {site_file_path} with Site ID: [{site_id}]\n"))
+        except FileNotFoundError:
+            gui_queue.put(('output', f"File not found: {site_file_path}\n"))
+        except Exception as e:
+            gui_queue.put(('output', f"Error deleting file: {site_file_path}, {e}\n"))
+
+        # Remove from the site list
+        if os.path.exists(SITE_LIST_FILE):
+            remove_site_record(site_name)
+            gui_queue.put(('output', f"Deleted Site ID: {site_id}\n"))
+
+    gui_queue.put(('callback', load_site_list))
+    gui_queue.put(('callback', lambda: checkbox_event()))
 
 def open_site_file(file_path):
     if platform.system() == "Windows":
@@ -422,7 +1380,7 @@ def open_site_file(file_path):
 
 def get_site_info(parent):
     # Load existing site data
-    df = pd.read_csv(SITE_LIST_FILE)
+    df = read_site_list()
     existing_site_ids = df['Site ID'].unique()
 
     # Function to autofill the entries based on selected site ID
@@ -499,8 +1457,6 @@ def add_site():
     file_path = filedialog.askopenfilename( parent=root, filetypes=[("CSV files", "*.csv"), ("Excel files", "*.xlsx")])
     if file_path:
         site_name = os.path.basename(file_path)
-        new_site_path = os.path.join(SITE_FILES_FOLDER, site_name)
-        shutil.copy(file_path, new_site_path)
         
         # Get Site ID, Latitude, and Longitude from the user
         site_info = get_site_info(root)
@@ -508,23 +1464,30 @@ def add_site():
         if site_info:
             site_id, latitude, longitude = site_info
             
-            # Update the CSV with the new site information
-            df = pd.read_csv(SITE_LIST_FILE)
-            new_row = pd.DataFrame({"Serial No.": [len(df)+1],
-                                    "File Name": [site_name],
-                                    "Site ID": [site_id],
-                                    "Latitude": [latitude],
-                                    "Longitude": [longitude]})
-            df = pd.concat([df, new_row], ignore_index=True)
-            df.to_csv(SITE_LIST_FILE, index=False)
-            
-            load_site_list()
-            checkbox_event()
-            if display_selection == 'Table':
-                display_table()
-            elif display_selection == 'Map':
-                display_map()
-            messagebox.showinfo("Success", f"Site '{site_name}' uploaded successfully!")
+            # Copy and register the file as a job so it cannot overwrite a site file that is being updated
+            job, created = submit_job('add', site_name, add_site_file, file_path, {"File Name": site_name,
+                                                                                   "Site ID": site_id,
+                                                                                   "Latitude": latitude,
+                                                                                   "Longitude": longitude},
+                                      gui_queue, locks=[SITE_LIST_LOCK, site_name])
+            if not created:
+                messagebox.showinfo("Upload in progress", f"Site '{site_name}' is already being uploaded.")
+
+def add_site_file(file_path, row, gui_queue, job=None):
+    # A failure is reported by refresh_job_status like that of any other job
+    with file_locks(SITE_LIST_LOCK, row['File Name']):
+        shutil.copy(file_path, os.path.join(SITE_FILES_FOLDER, row['File Name']))
+        add_site_records([row])
+
+    def refresh():
+        load_site_list()
+        checkbox_event()
+        if display_selection == 'Table':
+            display_table()
+        elif display_selection == 'Map':
+            display_map()
+    gui_queue.put(('callback', refresh))
+    gui_queue.put(('messagebox', "Success", f"Site '{row['File Name']}' uploaded successfully!"))
 
 def export_site():
     export_path = filedialog.askdirectory()
@@ -535,6 +1498,264 @@ def export_site():
         shutil.copytree(DATABASE_FOLDER, destination)
         messagebox.showinfo("Success", f"Database exported successfully to '{destination}'")
 
+def read_manifest(manifest_path):
+    manifest_df = pd.read_csv(manifest_path)
+    missing_columns = [col for col in MANIFEST_COLUMNS if col not in manifest_df.columns]
+    if missing_columns:
+        raise ValueError(f"Manifest {manifest_path} is missing column(s): {', '.join(missing_columns)}")
+    manifest_df = manifest_df[MANIFEST_COLUMNS].copy()
+    manifest_df['File Name'] = manifest_df['File Name'].fillna('').astype(str).str.strip()
+    return manifest_df
+
+def import_site_file(src_path, dest_folder):
+    # Runs in a worker process: validate one site file and copy it into the database
+    start = time.perf_counter()
+    file_name = os.path.basename(src_path)
+    result = {'File Name': file_name, 'rows': 0, 'bytes': 0, 'error': None}
+    try:
+        df = pd.read_csv(src_path)
+        if 'local_time' not in df.columns:
+            raise ValueError("column 'local_time' not found")
+        df = apply_site_schema(df.drop(columns=[col for col in df.columns if col.startswith('Unnamed:')]), exact=True)
+        result['rollups'] = compute_rollups(df)
+        with file_lock(file_name):
+            shutil.copy(src_path, os.path.join(dest_folder, file_name))
+        result['rows'] = len(df)
+        result['bytes'] = os.path.getsize(src_path)
+    except Exception as e:
+        result['error'] = str(e)
+    result['seconds'] = time.perf_counter() - start
+    return result
+
+def bulk_import_sites(directory, manifest_path, max_workers=None):
+    start = time.perf_counter()
+    manifest_df = read_manifest(manifest_path)
+    site_df = read_site_list()
+    known_files = set(site_df['File Name'])
+
+    summary = {'imported': [], 'skipped': [], 'failed': [], 'rows': 0, 'bytes': 0}
+    to_import = {}
+    for _, row in manifest_df.iterrows():
+        file_name = row['File Name']
+        src_path = os.path.join(directory, file_name)
+        # Site files live flat in the database folder, so the manifest must name the file itself
+        if '/' in file_name or '\\' in file_name:
+            summary['failed'].append((file_name, "File Name must not include a folder"))
+        elif file_name in known_files:
+            summary['skipped'].append((file_name, "already in site list"))
+        elif file_name in to_import:
+            summary['skipped'].append((file_name, "listed twice in manifest"))
+        elif not os.path.exists(src_path):
+            summary['skipped'].append((file_name, "file not found"))
+        elif pd.isna(pd.to_numeric(row['Latitude'], errors='coerce')) or pd.isna(pd.to_numeric(row['Longitude'], errors='coerce')):
+            summary['failed'].append((file_name, "invalid coordinates in manifest"))
+        else:
+            to_import[file_name] = row
+
+    results = {}
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        futures = {executor.submit(import_site_file, os.path.join(directory, file_name), SITE_FILES_FOLDER): file_name
+                   for file_name in to_import}
+        for future in as_completed(futures):
+            results[futures[future]] = future.result()
+
+    # Keep manifest order so serial numbers do not depend on which worker finished first
+    new_rows = []
+    for file_name, row in to_import.items():
+        result = results[file_name]
+        if result['error']:
+            summary['failed'].append((file_name, result['error']))
+            continue
+        new_rows.append({"File Name": file_name,
+                         "Site ID": row['Site ID'],
+                         "Latitude": row['Latitude'],
+                         "Longitude": row['Longitude']})
+        summary['imported'].append(file_name)
+        summary['rows'] += result['rows']
+        summary['bytes'] += result['bytes']
+
+    # One write of the site list for the whole batch; undo the copies if it fails
+    if new_rows:
+        try:
+            add_site_records(new_rows, {row['File Name']: results[row['File Name']]['rollups'] for row in new_rows})
+        except Exception:
+            for file_name in summary['imported']:
+                os.remove(os.path.join(SITE_FILES_FOLDER, file_name))
+            raise
+
+    summary['seconds'] = time.perf_counter() - start
+    return summary
+
+def print_import_summary(summary):
+    seconds = max(summary['seconds'], 1e-9)
+    print(f"Imported: {len(summary['imported'])}  Skipped: {len(summary['skipped'])}  Failed: {len(summary['failed'])}")
+    for file_name, reason in summary['skipped']:
+        print(f"  skipped {file_name}: {reason}")
+    for file_name, reason in summary['failed']:
+        print(f"  failed  {file_name}: {reason}")
+    print(f"Elapsed: {seconds:.2f} s  |  {len(summary['imported']) / seconds:.1f} files/s  |  "
+          f"{summary['rows'] / seconds:,.0f} rows/s  |  {summary['bytes'] / seconds / 1024**2:.1f} MB/s")
+
+def update_site_files(file_names, max_jobs=None, chunked=None):
+    # Command line meteorology update, up to JOB_WORKERS (or max_jobs) files at a time; status messages
+    # that the GUI would show are printed per file once its job finishes
+    global JOB_WORKERS
+    if max_jobs:
+        JOB_WORKERS = max_jobs
+    jobs = []
+    for file_name in dict.fromkeys(file_names):
+        status_queue = queue.Queue()
+        job, _ = submit_job('update', file_name, functools.partial(fetch_and_update_data, chunked=chunked),
+                            file_name, None, 'status', status_queue, locks=[file_name])
+        jobs.append((file_name, job, status_queue))
+
+    failed = 0
+    for file_name, job, status_queue in jobs:
+        job['done'].wait()
+        while not status_queue.empty():
+            task = status_queue.get()
+            if task[0] == 'status':
+                print(f"[{file_name}] {task[1]}")
+        if job['state'] == 'failed':
+            failed += 1
+            print(f"[{file_name}] failed: {job['error']}")
+    return failed
+
+def write_synthetic_site_files(folder, n_files, years):
+    # Multi-year hourly site files with random measurements, for the benchmarks
+    rng = np.random.default_rng(0)
+    times = pd.date_range("2020-01-01", periods=years * 365 * 24, freq="h").strftime("%d/%m/%Y %H:%M")
+    paths = []
+    for i in range(n_files):
+        df = pd.DataFrame({'entity_id': f"logger_{i:03d}", 'local_time': times,
+                           'drip_rate': rng.gamma(2.0, 5.0, len(times)).round(2)})
+        for param in POWER_PARAMETERS:
+            df[param] = rng.normal(20, 5, len(times)).round(2)
+        path = os.path.join(folder, f"site_{i:03d}.csv")
+        df.to_csv(path, index=False)
+        paths.append(path)
+    return paths, len(times)
+
+def benchmark_memory(n_files=24, years=3):
+    # Load synthetic multi-year hourly site files with default dtypes and with SITE_DATA_SCHEMA
+    import tempfile
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        paths, n_rows = write_synthetic_site_files(tmp_dir, n_files, years)
+
+        default_bytes = typed_bytes = 0
+        for path in paths:
+            # Previous load path: default dtypes with local_time parsed by parse_date
+            df = pd.read_csv(path)
+            df['local_time'] = df['local_time'].apply(parse_date)
+            default_bytes += df.memory_usage(deep=True).sum()
+            typed_bytes += apply_site_schema(pd.read_csv(path)).memory_usage(deep=True).sum()
+
+    print(f"{n_files} files x {n_rows:,} hourly rows")
+    print(f"Default dtypes:    {default_bytes / 1024**2:9.1f} MB")
+    print(f"SITE_DATA_SCHEMA:  {typed_bytes / 1024**2:9.1f} MB  ({default_bytes / typed_bytes:.1f}x smaller)")
+
+def benchmark_scan(n_files=24, years=3, max_workers=None):
+    # Time a full read-and-summarize scan of synthetic site files with 1, 2, 4, ... up to max_workers processes
+    import tempfile
+    max_workers = max_workers or os.cpu_count() or 1
+    worker_counts = sorted({min(2 ** i, max_workers) for i in range(max_workers.bit_length() + 1)})
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        paths, n_rows = write_synthetic_site_files(tmp_dir, n_files, years)
+        print(f"{n_files} files x {n_rows:,} hourly rows, {sum(os.path.getsize(path) for path in paths) / 1024**2:.0f} MB")
+        print(f"{'workers':>7}  {'seconds':>8}  {'speedup':>7}  {'files/s':>8}")
+        baseline = reference = None
+        for workers in worker_counts:
+            # Start the worker processes outside the timing
+            parallel_scan([tmp_dir] * max(workers, SCAN_SERIAL_FILES), os.path.isdir, max_workers=workers, chunksize=1)
+            start = time.perf_counter()
+            results = parallel_scan(paths, _summarize_csv_path, max_workers=workers)
+            elapsed = time.perf_counter() - start
+            summary = combine_summaries([result for result, _ in results])
+            if reference is None:
+                baseline, reference = elapsed, summary
+            elif not summary.equals(reference):
+                print("  results differ from the single-process scan")
+            print(f"{workers:>7}  {elapsed:>8.2f}  {baseline / elapsed:>6.1f}x  {n_files / elapsed:>8.1f}")
+
+def run_cli(argv):
+    parser = argparse.ArgumentParser(prog="main.py", description="NGROS database command line tools. Run without arguments to open the GUI.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    bulk_parser = subparsers.add_parser("bulk-import", help="Import a folder of site files listed in a manifest CSV")
+    bulk_parser.add_argument("directory", help="Folder containing the site files")
+    bulk_parser.add_argument("manifest", help=f"CSV with columns: {', '.join(MANIFEST_COLUMNS)}")
+    bulk_parser.add_argument("--workers", type=int, default=None, help="Number of worker processes (default: CPU count)")
+
+    subparsers.add_parser("sqlite-import", help=f"Load {SITE_LIST_FILE} and the site files into {SQLITE_DB_FILE}")
+    export_parser = subparsers.add_parser("sqlite-export", help=f"Write {SQLITE_DB_FILE} back out in the CSV layout")
+    export_parser.add_argument("destination", help="Folder to write site_list.csv and site_files/ into")
+
+    memory_parser = subparsers.add_parser("benchmark-memory", help="Compare memory use of site data with and without the typed schema")
+    memory_parser.add_argument("--files", type=int, default=24, help="Number of synthetic site files")
+    memory_parser.add_argument("--years", type=int, default=3, help="Years of hourly data per file")
+
+    query_parser = subparsers.add_parser("query-sites", help="List the sites matched by a spatial query")
+    query_parser.add_argument("query", help="bbox:MIN_LON,MIN_LAT,MAX_LON,MAX_LAT | radius:LAT,LON,KM | nearest:LAT,LON[,K] | region:NAME")
+
+    aggregate_parser = subparsers.add_parser("aggregate", help="Statistics of every parameter over several site files")
+    aggregate_parser.add_argument("files", nargs="*", help="Site files to include (default: all, or those matched by --query)")
+    aggregate_parser.add_argument("--query", help="Only include the site files matched by this spatial query")
+    aggregate_parser.add_argument("--start", help="Only include rows at or after this local time")
+    aggregate_parser.add_argument("--end", help="Only include rows at or before this local time")
+    aggregate_parser.add_argument("--workers", type=int, default=None, help="Number of worker processes (default: CPU count)")
+
+    scan_parser = subparsers.add_parser("benchmark-scan", help="Time a parallel scan of synthetic site files with 1 to N worker processes")
+    scan_parser.add_argument("--files", type=int, default=24, help="Number of synthetic site files")
+    scan_parser.add_argument("--years", type=int, default=3, help="Years of hourly data per file")
+    scan_parser.add_argument("--workers", type=int, default=None, help="Largest number of worker processes (default: CPU count)")
+
+    update_parser = subparsers.add_parser("update", help="Fetch meteorological data for several site files")
+    update_parser.add_argument("files", nargs="*", help="Site files to update (default: all, or those matched by --query)")
+    update_parser.add_argument("--query", help="Only update the site files matched by this spatial query")
+    update_parser.add_argument("--chunked", action="store_true", default=None,
+                               help=f"Stream every file in blocks of {UPDATE_CHUNK_ROWS:,} rows (default: only files over {CHUNKED_UPDATE_MB} MB)")
+    update_parser.add_argument("--jobs", type=int, default=None, help=f"Files updated at the same time (default: {JOB_WORKERS})")
+
+    args = parser.parse_args(argv)
+    if args.command == "bulk-import":
+        summary = bulk_import_sites(args.directory, args.manifest, args.workers)
+        print_import_summary(summary)
+        return 1 if summary['failed'] else 0
+    elif args.command == "sqlite-import":
+        print(f"Imported {import_csv_layout()} site file(s) into {SQLITE_DB_FILE}")
+    elif args.command == "sqlite-export":
+        print(f"Exported {export_csv_layout(args.destination)} site file(s) to {args.destination}")
+    elif args.command == "query-sites":
+        start = time.perf_counter()
+        matches = query_sites(args.query)
+        elapsed = time.perf_counter() - start
+        print(matches.to_string(index=False))
+        print(f"{len(matches)} site file(s) in {elapsed * 1000:.2f} ms (including index build on first query)")
+    elif args.command == "update":
+        file_names = args.files or list_site_files()
+        if args.query:
+            matched = set(query_sites(args.query)['File Name'])
+            file_names = [f for f in file_names if f in matched]
+        return 1 if update_site_files(file_names, args.jobs, args.chunked) else 0
+    elif args.command == "aggregate":
+        file_names = args.files or list_site_files()
+        if args.query:
+            matched = set(query_sites(args.query)['File Name'])
+            file_names = [f for f in file_names if f in matched]
+        start = time.perf_counter()
+        stats, errors = aggregate_sites(file_names, args.start, args.end, args.workers or os.cpu_count())
+        elapsed = time.perf_counter() - start
+        print(stats.to_string(index=False, float_format=lambda value: f"{value:.3f}"))
+        for file_name, error in errors:
+            print(f"  failed  {file_name}: {error}")
+        print(f"{len(file_names) - len(errors)} site file(s) in {elapsed:.2f} s")
+        return 1 if errors else 0
+    elif args.command == "benchmark-memory":
+        benchmark_memory(args.files, args.years)
+    elif args.command == "benchmark-scan":
+        benchmark_scan(args.files, args.years, args.workers)
+    return 0
+
 def on_combobox_select(*args):
     global display_selection
     display_selection = display_var.get()
@@ -544,7 +1765,62 @@ def on_combobox_select(*args):
     elif display_selection == "Map":
         display_map()
 
+def apply_site_filter(query):
+    # Limit the table, map and file list to the sites matched by a spatial query; an empty query clears the filter
+    global site_filter_query
+    query = query.strip()
+    if not query:
+        site_filter_query = None
+        out_text.insert(ctk.END, "Site filter cleared\n")
+    else:
+        try:
+            matches = query_sites(query)
+        except Exception as e:
+            messagebox.showerror("Error", f"Site query failed: {e}")
+            return
+        site_filter_query = query
+        out_text.insert(ctk.END, f"Site filter '{query}': {matches['Site ID'].nunique()} site(s), {len(matches)} file(s)\n")
+    checkbox_event()
+    on_combobox_select()
+
+# Site rendering on the map: sites closer than MAP_CLUSTER_CELL_PX on screen are drawn as one marker
+MAP_CLUSTER_CELL_PX = 40
+MAP_LABEL_FONTSIZE = 8
+
+def cluster_points(xy, cell_px):
+    # Group display-space points by cell_px grid cell; returns the cluster of each point and the size of each cluster
+    cells = np.floor(xy / cell_px).astype(np.int64)
+    _, cluster_of, counts = np.unique(cells, axis=0, return_inverse=True, return_counts=True)
+    return cluster_of.ravel(), counts
+
+def select_labels(boxes):
+    # Greedily keep labels, in the given order, whose (x, y, width, height) display boxes do not overlap an
+    # already kept one. Kept boxes are bucketed on a grid as large as the biggest box, so only neighbouring
+    # cells have to be checked.
+    if len(boxes) == 0:
+        return []
+    cell_w = max(box[2] for box in boxes) or 1
+    cell_h = max(box[3] for box in boxes) or 1
+    grid = defaultdict(list)
+    kept = []
+    for i, (x, y, w, h) in enumerate(boxes):
+        cx, cy = int(x // cell_w), int(y // cell_h)
+        collides = any(x < ox + ow and ox < x + w and y < oy + oh and oy < y + h
+                       for gx in (cx - 1, cx, cx + 1) for gy in (cy - 1, cy, cy + 1)
+                       for ox, oy, ow, oh in grid[(gx, gy)])
+        if not collides:
+            grid[(cx, cy)].append((x, y, w, h))
+            kept.append(i)
+    return kept
+
 def display_map():
+    # The geospatial and plotting stacks take seconds to import, so they are only loaded by the map and graph views
+    import geopandas as gpd, rasterio
+    from rasterio.plot import show
+    from matplotlib.figure import Figure
+    from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg, NavigationToolbar2Tk
+    from scipy.spatial import cKDTree
+
     root.geometry(f"{window_width+250}x{window_height}+{x_position}+{y_position}")
     
     # Clear previous content in display_frame
@@ -557,61 +1833,137 @@ def display_map():
     canvas_frame_map.grid_columnconfigure(0, weight=1)
 
     if os.path.exists(SITE_LIST_FILE):
-        df = pd.read_csv(SITE_LIST_FILE)
+        df = filter_sites(read_site_list())
 
-        # Create a GeoDataFrame
         if not df.empty:
-            gdf = gpd.GeoDataFrame(
-                df, 
-                geometry=gpd.points_from_xy(df.Longitude, df.Latitude)
-            )
-
-            # Plotting using matplotlib
-            fig, ax = plt.subplots(figsize=(10, 6))
-            australia = gpd.read_file(SHP_PATH)
-            
+            # One marker per site location, even if the site has several files
+            sites = df.drop_duplicates(subset=['Site ID', 'Latitude', 'Longitude']).reset_index(drop=True)
+            lon = sites['Longitude'].to_numpy(dtype=float)
+            lat = sites['Latitude'].to_numpy(dtype=float)
+            site_ids = sites['Site ID'].astype(str).to_numpy()
+            tooltip_columns = [col for col in sites.columns if col not in ['Serial No.', 'File Name']]
+            tooltips = ['\n'.join(f"{col}: {value}" for col, value in zip(tooltip_columns, row))
+                        for row in sites[tooltip_columns].itertuples(index=False, name=None)]
+            site_tree = cKDTree(np.column_stack([lon, lat]))
+
+            fig = Figure(figsize=(8, 5), dpi=110)
+            ax = fig.add_subplot(111)
+            canvas = FigureCanvasTkAgg(fig, master=canvas_frame_map)
             try:
                 with rasterio.open(BASEMAP_PATH) as src:
-                    fig = Figure(figsize=(8, 5), dpi=110)
-                    ax = fig.add_subplot(111)
                     show(src, ax=ax)
-                    ax.set_title("NGROS Sites")
-                    canvas = FigureCanvasTkAgg(fig, master=canvas_frame_map)
-                    canvas.draw()
-                    canvas.get_tk_widget().grid(row=0, column=0, sticky='nsew')
-    
-                    # Add the Matplotlib toolbar for zoom and pan
-                    toolbar_frame = tk.Frame(canvas_frame_map)
-                    toolbar_frame.grid(row=1, column=0, sticky='nsew')
-                    toolbar = NavigationToolbar2Tk(canvas, toolbar_frame)
-                    toolbar.update()
-                    toolbar.pack(side=ctk.TOP, fill=ctk.X)
-                    
             except Exception as e:
                 messagebox.showerror("Error", f"Failed to load file: {e}")
+            ax.set_title("NGROS Sites")
 
-            gdf.plot(ax=ax, color='red', markersize=50)
+            australia = gpd.read_file(SHP_PATH)
             australia.boundary.plot(ax=ax, linewidth=0.5, linestyle=':', alpha=0.8, color='black')
 
-            # Add site ID labels
-            for x, y, label in zip(gdf.geometry.x, gdf.geometry.y, gdf['Site ID']):
-                ax.text(x, y, label, fontsize=8, ha='right')
-
-            # Add mplcursors for interactivity
-            cursor = mplcursors.cursor(ax.collections[0], hover=mplcursors.HoverMode.Transient)
-
-            @cursor.connect("add")
-            def on_add(sel):
-                index = sel.index
-                info = gdf.iloc[index]
-                text = '\n'.join(f"{col}: {info[col]}" for col in gdf.columns if col not in ['geometry', 'Serial No.', 'File Name'])
-                sel.annotation.set(text=text)
-                sel.annotation.get_bbox_patch().set_alpha(0.8)
-
-            @cursor.connect("remove")
-            def on_remove(sel):
-                sel.annotation.set_visible(False)
-                sel.annotation.set_text('')
+            markers = ax.scatter(lon, lat, color='red', s=50, zorder=3)
+            annotation = ax.annotate("", xy=(0, 0), xytext=(15, 15), textcoords='offset points', zorder=5,
+                                     bbox=dict(boxstyle='round', fc='white', alpha=0.8), arrowprops=dict(arrowstyle='->'))
+            annotation.set_visible(False)
+            state = {'labels': [], 'visible': None, 'position': None, 'cluster_of': None, 'counts': None,
+                     'centres': None, 'hovered': None, 'pending': False}
+
+            def render_sites():
+                # Re-cluster the sites in view and place the labels that fit at the current zoom
+                state['pending'] = False
+                for label in state['labels']:
+                    label.remove()
+                state['labels'] = []
+
+                x0, x1 = sorted(ax.get_xlim())
+                y0, y1 = sorted(ax.get_ylim())
+                visible = np.flatnonzero((lon >= x0) & (lon <= x1) & (lat >= y0) & (lat <= y1))
+                cluster_of, counts = cluster_points(ax.transData.transform(np.column_stack([lon[visible], lat[visible]])),
+                                                    MAP_CLUSTER_CELL_PX)
+                centres = np.column_stack([np.bincount(cluster_of, weights=lon[visible], minlength=len(counts)) / counts,
+                                           np.bincount(cluster_of, weights=lat[visible], minlength=len(counts)) / counts])
+                markers.set_offsets(centres.reshape(-1, 2))
+                markers.set_sizes(50 * (1 + np.log2(counts)))
+                position = np.full(len(lon), -1)
+                position[visible] = np.arange(len(visible))
+                state.update(visible=visible, position=position, cluster_of=cluster_of, counts=counts, centres=centres, hovered=None)
+                annotation.set_visible(False)
+                if len(counts) == 0:
+                    return
+
+                # Labels: cluster sizes (largest first) centred on their marker, then site IDs to the left of single sites
+                order = np.argsort(cluster_of, kind='stable')
+                first_member = visible[order[np.searchsorted(cluster_of[order], np.arange(len(counts)))]]
+                centres_px = ax.transData.transform(centres)
+                char_px = MAP_LABEL_FONTSIZE * fig.dpi / 72
+                candidates = sorted(range(len(counts)), key=lambda c: -counts[c])
+                texts, boxes = [], []
+                for c in candidates:
+                    text = str(counts[c]) if counts[c] > 1 else site_ids[first_member[c]]
+                    width, height = 0.6 * char_px * len(text), 1.2 * char_px
+                    x, y = centres_px[c]
+                    texts.append(text)
+                    boxes.append((x - width / 2, y - height / 2, width, height) if counts[c] > 1 else (x - width, y, width, height))
+                for i in select_labels(boxes):
+                    c = candidates[i]
+                    if counts[c] > 1:
+                        label = ax.text(*centres[c], texts[i], fontsize=MAP_LABEL_FONTSIZE, ha='center', va='center',
+                                        color='white', fontweight='bold', zorder=4)
+                    else:
+                        label = ax.text(*centres[c], texts[i], fontsize=MAP_LABEL_FONTSIZE, ha='right', zorder=4)
+                    state['labels'].append(label)
+
+            def schedule_render(*args):
+                # Zooming changes both limits and panning fires continuously; render once when Tk is idle
+                if not state['pending']:
+                    state['pending'] = True
+                    canvas.get_tk_widget().after_idle(lambda: (render_sites(), canvas.draw_idle()))
+
+            def on_hover(event):
+                hovered = None
+                if event.inaxes is ax and state['counts'] is not None and len(state['counts']):
+                    # Sites within one cluster cell of the cursor, from the KD-tree, then the nearest marker under it
+                    (cx, cy), (ex, ey) = ax.transData.inverted().transform([(event.x, event.y),
+                                                                             (event.x + MAP_CLUSTER_CELL_PX, event.y + MAP_CLUSTER_CELL_PX)])
+                    nearby = site_tree.query_ball_point([cx, cy], max(abs(ex - cx), abs(ey - cy)))
+                    clusters = {state['cluster_of'][state['position'][site]] for site in nearby if state['position'][site] >= 0}
+                    best_distance = None
+                    for c in clusters:
+                        mx, my = ax.transData.transform(state['centres'][c])
+                        distance = np.hypot(mx - event.x, my - event.y)
+                        radius = np.sqrt(markers.get_sizes()[c]) / 2 * fig.dpi / 72 + 2
+                        if distance <= radius and (best_distance is None or distance < best_distance):
+                            hovered, best_distance = c, distance
+
+                if hovered == state['hovered']:
+                    return
+                state['hovered'] = hovered
+                if hovered is None:
+                    annotation.set_visible(False)
+                else:
+                    members = state['visible'][state['cluster_of'] == hovered]
+                    if len(members) == 1:
+                        text = tooltips[members[0]]
+                    else:
+                        text = f"{len(members)} sites:\n" + '\n'.join(site_ids[members[:10]]) + ('\n...' if len(members) > 10 else '')
+                    annotation.xy = state['centres'][hovered]
+                    annotation.set_text(text)
+                    annotation.set_visible(True)
+                canvas.draw_idle()
+
+            render_sites()
+            ax.callbacks.connect('xlim_changed', schedule_render)
+            ax.callbacks.connect('ylim_changed', schedule_render)
+            canvas.mpl_connect('resize_event', schedule_render)
+            canvas.mpl_connect('motion_notify_event', on_hover)
+
+            canvas.draw()
+            canvas.get_tk_widget().grid(row=0, column=0, sticky='nsew')
+
+            # Add the Matplotlib toolbar for zoom and pan
+            toolbar_frame = tk.Frame(canvas_frame_map)
+            toolbar_frame.grid(row=1, column=0, sticky='nsew')
+            toolbar = NavigationToolbar2Tk(canvas, toolbar_frame)
+            toolbar.update()
+            toolbar.pack(side=ctk.TOP, fill=ctk.X)
 
         else:
             messagebox.showinfo("No Sites", "No sites available to display on the map.")
@@ -633,6 +1985,121 @@ def display_map():
 
     display_graph(graph_frame, plot_frame)
 
+# Hover highlighting in the graph view: the cursor must be within HOVER_TOLERANCE_PX of a line,
+# and series longer than HOVER_INDEX_MAX_POINTS are indexed as per-bucket min/max envelopes
+HOVER_TOLERANCE_PX = 5
+HOVER_INDEX_MAX_POINTS = 20000
+
+def build_hover_index(line, max_points=HOVER_INDEX_MAX_POINTS):
+    # x sorted (in matplotlib's converted units, e.g. date numbers) with the low, high and mid y at each x,
+    # decimated to an envelope for hit-testing, plus the sorted raw x and y that tooltip values come from
+    xy = line.get_xydata()
+    xy = xy[np.isfinite(xy).all(axis=1)]
+    xy = xy[np.argsort(xy[:, 0], kind='stable')]
+    raw_x, raw_y = xy[:, 0], xy[:, 1]
+    if len(raw_x) > max_points:
+        starts = np.unique(np.linspace(0, len(raw_x), max_points // 2, endpoint=False).astype(int))
+        x, y_low, y_high = raw_x[starts], np.minimum.reduceat(raw_y, starts), np.maximum.reduceat(raw_y, starts)
+    else:
+        x, y_low, y_high = raw_x, raw_y, raw_y
+    return x, y_low, y_high, (y_low + y_high) / 2, raw_x, raw_y
+
+def hover_sample(index, x, y, x_tol, y_tol):
+    # Position in the raw arrays of the sample to show for a cursor at (x, y): the one closest to the
+    # cursor (in tolerance units) among the samples within x_tol, else the nearest in x
+    raw_x, raw_y = index[4], index[5]
+    lo = np.searchsorted(raw_x, x - x_tol, side='left')
+    hi = np.searchsorted(raw_x, x + x_tol, side='right')
+    if hi > lo:
+        distance = ((raw_x[lo:hi] - x) / x_tol) ** 2 + ((raw_y[lo:hi] - y) / y_tol) ** 2
+        return lo + int(np.argmin(distance))
+    point = min(lo, len(raw_x) - 1)
+    if point > 0 and x - raw_x[point - 1] < raw_x[point] - x:
+        point -= 1
+    return point
+
+def hover_distance(index, x, y, x_tol, y_tol):
+    # Vertical distance from (x, y) to the indexed line, or None if the line is not within the tolerances
+    xs, y_low, y_high, y_mid = index[:4]
+    if len(xs) == 0 or x + x_tol < xs[0] or x - x_tol > xs[-1]:
+        return None
+    lo = np.searchsorted(xs, x - x_tol, side='left')
+    hi = np.searchsorted(xs, x + x_tol, side='right')
+    # Interpolated values at the window edges catch segments that cross it without a point inside
+    lows = [np.interp(x - x_tol, xs, y_low), np.interp(x + x_tol, xs, y_low)]
+    highs = [np.interp(x - x_tol, xs, y_high), np.interp(x + x_tol, xs, y_high)]
+    if hi > lo:
+        lows.append(y_low[lo:hi].min())
+        highs.append(y_high[lo:hi].max())
+    if min(lows) - y_tol <= y <= max(highs) + y_tol:
+        return abs(y - np.interp(x, xs, y_mid))
+    return None
+
+def attach_hover_highlight(fig, ax, lines):
+    # Highlights the line under the cursor and shows its value. The rendered figure is cached as a
+    # background and only the overlay is blitted, and only when the hovered line or point changes.
+    from matplotlib.patches import Rectangle
+    canvas = fig.canvas
+    indexes = [build_hover_index(line) for line in lines]
+    dim_patch = Rectangle((0, 0), 1, 1, transform=ax.transAxes, facecolor=ax.get_facecolor(), alpha=0.7, animated=True)
+    ax.add_patch(dim_patch)
+    tooltip = ax.annotate("", xy=(0, 0), xytext=(15, 15), textcoords='offset points', animated=True,
+                          bbox=dict(boxstyle='round', fc='yellow', alpha=0.6), arrowprops=dict(arrowstyle='->'))
+    state = {'background': None, 'hovered': None}
+
+    def blit_overlay():
+        canvas.restore_region(state['background'])
+        if state['hovered'] is not None:
+            line = lines[state['hovered'][0]]
+            linewidth = line.get_linewidth()
+            ax.draw_artist(dim_patch)
+            line.set_linewidth(2)
+            ax.draw_artist(line)
+            line.set_linewidth(linewidth)
+            ax.draw_artist(tooltip)
+        canvas.blit(fig.bbox)
+
+    def on_draw(event):
+        # Full redraws (resize, zoom, pan) refresh the cached background
+        state['background'] = canvas.copy_from_bbox(fig.bbox)
+        if state['hovered'] is not None:
+            blit_overlay()
+
+    def on_move(event):
+        if state['background'] is None:
+            return
+        hovered = None
+        if event.inaxes is ax:
+            inverse = ax.transData.inverted()
+            (x0, y0), (x1, y1) = inverse.transform([(event.x - HOVER_TOLERANCE_PX, event.y - HOVER_TOLERANCE_PX),
+                                                    (event.x + HOVER_TOLERANCE_PX, event.y + HOVER_TOLERANCE_PX)])
+            x_tol, y_tol = abs(x1 - x0) / 2, abs(y1 - y0) / 2
+            best = None
+            for i, index in enumerate(indexes):
+                distance = hover_distance(index, event.xdata, event.ydata, x_tol, y_tol)
+                if distance is not None and (best is None or distance < best[1]):
+                    best = (i, distance)
+            if best is not None:
+                hovered = (best[0], hover_sample(indexes[best[0]], event.xdata, event.ydata, x_tol, y_tol))
+
+        if hovered == state['hovered']:
+            return
+        state['hovered'] = hovered
+        if hovered is not None:
+            raw_x, raw_y = indexes[hovered[0]][4:]
+            tooltip.xy = (raw_x[hovered[1]], raw_y[hovered[1]])
+            tooltip.set_text(f"{lines[hovered[0]].get_label()}\n{raw_y[hovered[1]]:.2f}")
+        blit_overlay()
+
+    def on_leave(event):
+        if state['hovered'] is not None and state['background'] is not None:
+            state['hovered'] = None
+            blit_overlay()
+
+    canvas.mpl_connect('draw_event', on_draw)
+    canvas.mpl_connect('motion_notify_event', on_move)
+    canvas.mpl_connect('figure_leave_event', on_leave)
+
 def display_graph(graph_frame, plot_frame):
     # Clear previous content in graph_frame
     for widget in graph_frame.winfo_children():
@@ -643,7 +2110,7 @@ def display_graph(graph_frame, plot_frame):
 
     # Load site list DataFrame
     if os.path.exists(SITE_LIST_FILE):
-        df = pd.read_csv(SITE_LIST_FILE)
+        df = filter_sites(read_site_list())
     else:
         messagebox.showerror("Error", f"Site list file {SITE_LIST_FILE} does not exist.")
         return
@@ -659,6 +2126,14 @@ def display_graph(graph_frame, plot_frame):
     parameter_combobox = ttk.Combobox(graph_frame, state="readonly")
     parameter_combobox.grid(row=1, column=1, padx=10, pady=10, sticky='w')
 
+    # Optional time range; blank entries plot the whole record
+    time_range_label = ctk.CTkLabel(graph_frame, text="Time Range:", font=('Calibri', 13))
+    time_range_label.grid(row=2, column=0, padx=10, pady=10, sticky='w')
+    start_entry = ctk.CTkEntry(graph_frame, placeholder_text="From: YYYY-MM-DD HH:MM:SS")
+    start_entry.grid(row=2, column=1, padx=10, pady=10, sticky='ew')
+    end_entry = ctk.CTkEntry(graph_frame, placeholder_text="To: YYYY-MM-DD HH:MM:SS")
+    end_entry.grid(row=2, column=2, padx=10, pady=10, sticky='ew')
+
     # Load unique site IDs into site_id_combobox
     site_id_combobox['values'] = df['Site ID'].unique().tolist()
 
@@ -668,33 +2143,27 @@ def display_graph(graph_frame, plot_frame):
         if selected_site_id:
             if os.path.exists(SITE_LIST_FILE):
                 try:
-                    site_list_df = pd.read_csv(SITE_LIST_FILE)
+                    site_list_df = read_site_list()
                     site_info = site_list_df[site_list_df['Site ID'] == selected_site_id]
     
                     if site_info.empty:
                         messagebox.showerror("Error", "No site information found for the selected Site ID.")
                         return
                     
-                    parameters = set()
-                    for _, row in site_info.iterrows():
-                        site_name = row['File Name']
-                        site_file_path = os.path.join(SITE_FILES_FOLDER, f"{site_name}")
-    
-                        if os.path.exists(site_file_path):
-                            try:
-                                site_data = pd.read_csv( site_file_path)
-                                unnamed_columns = [col for col in site_data.columns if col.startswith('Unnamed:')]
-                                site_data = site_data.drop(columns=unnamed_columns, axis=1)
-                                if not site_data.empty:
-                                    parameters.update(site_data.columns.tolist())
-                                else:
-                                    messagebox.showwarning("Warning", f"The site file {site_name} is empty or invalid.")
-                            except pd.errors.ParserError as e:
-                                messagebox.showwarning("Warning", f"Failed to read the site file {site_name}: {e}")
-                            except Exception as e:
-                                messagebox.showwarning("Warning", f"An unexpected error occurred while reading {site_name}: {e}")
-                        else:
+                    parameters = {}  # ordered set: columns in the order the files list them
+                    available_files = set(list_site_files())
+                    site_names = [site_name for site_name in site_info['File Name'] if site_name in available_files]
+                    for site_name in site_info['File Name']:
+                        if site_name not in available_files:
                             messagebox.showwarning("Warning", f"Site file {site_name} does not exist.")
+
+                    for site_name, (columns, error) in zip(site_names, parallel_scan(site_names, site_file_columns)):
+                        if error:
+                            messagebox.showwarning("Warning", f"Failed to read the site file {site_name}: {error}")
+                        elif columns:
+                            parameters.update(dict.fromkeys(columns))
+                        else:
+                            messagebox.showwarning("Warning", f"The site file {site_name} is empty or invalid.")
     
                     if parameters:
                         parameter_combobox['values'] = list(parameters)
@@ -715,11 +2184,21 @@ def display_graph(graph_frame, plot_frame):
         selected_parameter = parameter_combobox.get()
     
         if selected_site_id and selected_parameter:
+            try:
+                start_time = parse_date(start_entry.get().strip()) if start_entry.get().strip() else None
+                end_time = parse_date(end_entry.get().strip()) if end_entry.get().strip() else None
+            except ValueError as e:
+                messagebox.showerror("Error", f"Invalid time range: {e}")
+                return
+
+            import matplotlib.pyplot as plt
+            from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg, NavigationToolbar2Tk
+            plt.ioff()
             fig, ax = plt.subplots(figsize=(8, 5))
     
             if os.path.exists(SITE_LIST_FILE):
                 try:
-                    site_list_df = pd.read_csv(SITE_LIST_FILE)
+                    site_list_df = read_site_list()
                     site_info = site_list_df[site_list_df['Site ID'] == selected_site_id]
     
                     if site_info.empty:
@@ -727,25 +2206,22 @@ def display_graph(graph_frame, plot_frame):
                         return
                     
                     lines = []
-                    line_properties = []
+                    available_files = set(list_site_files())
                     for _, row in site_info.iterrows():
                         site_name = row['File Name']
-                        site_file_path = os.path.join(SITE_FILES_FOLDER, f"{site_name}")
     
-                        if os.path.exists(site_file_path):
+                        if site_name in available_files:
                             try:
-                                site_data = pd.read_csv(site_file_path)
+                                # Read in this process through the shared cache; long spans come from the
+                                # coarsest rollup level that still fills the plot
+                                site_data = query_site_series(site_name, start_time, end_time, columns=[selected_parameter],
+                                                              max_points=MAX_PLOT_POINTS)
                                 if 'local_time' in site_data.columns and selected_parameter in site_data.columns:
-                                    site_data['local_time'] = site_data['local_time'].apply(parse_date)
                                     filtered_data = site_data
+                                    rollup_level = site_data.attrs.get('rollup')
                                     line, = ax.plot(filtered_data['local_time'], filtered_data[selected_parameter], 
-                                                    label=site_name)
+                                                    label=f"{site_name} ({rollup_level} mean)" if rollup_level else site_name)
                                     lines.append(line)
-                                    line_properties.append({
-                                        'color': line.get_color(),
-                                        'linewidth': line.get_linewidth(),
-                                        'alpha': line.get_alpha() if line.get_alpha() is not None else 1.0
-                                    })
                                 else:
                                     messagebox.showwarning("Warning", f"The file {site_name} does not contain the required columns.")
                             except pd.errors.ParserError as e:
@@ -762,8 +2238,9 @@ def display_graph(graph_frame, plot_frame):
     
                     fig.autofmt_xdate()
     
-                    # Add the figure to the Tkinter canvas
+                    # Add the figure to the Tkinter canvas; hover handling hooks the first draw
                     canvas = FigureCanvasTkAgg(fig, master=plot_frame)
+                    attach_hover_highlight(fig, ax, lines)
                     canvas.draw()
                     canvas.get_tk_widget().grid(row=2, column=0, columnspan=2, sticky='nsew')
     
@@ -773,43 +2250,6 @@ def display_graph(graph_frame, plot_frame):
                     toolbar = NavigationToolbar2Tk(canvas, toolbar_frame)
                     toolbar.update()
     
-                    # Make the plot interactive with hover highlighting and tooltips
-                    cursor = mplcursors.cursor(lines, hover=mplcursors.HoverMode.Transient)
-    
-                    def on_hover(event):
-                        hovered_line = None
-                        for line in lines:
-                            if line.contains(event)[0]:
-                                hovered_line = line
-                                break
-    
-                        if hovered_line:
-                            for i, line in enumerate(lines):
-                                if line == hovered_line:
-                                    line.set_linewidth(2)
-                                    line.set_alpha(1.0)
-                                else:
-                                    line.set_alpha(0.3)
-                        else:
-                            for i, line in enumerate(lines):
-                                line.set_alpha(line_properties[i]['alpha'])
-    
-                        fig.canvas.draw_idle()
-    
-                    def on_leave(event):
-                        for i, line in enumerate(lines):
-                            line.set_alpha(line_properties[i]['alpha'])
-                        fig.canvas.draw_idle()
-    
-                    fig.canvas.mpl_connect('motion_notify_event', on_hover)
-                    fig.canvas.mpl_connect('figure_leave_event', on_leave)
-    
-                    @cursor.connect("add")
-                    def on_add(sel):
-                        x, y = sel.target
-                        sel.annotation.set_text(f'{sel.artist.get_label()}\n{sel.target[1]:.2f}')
-                        sel.annotation.get_bbox_patch().set(fc="yellow", alpha=0.6)
-    
                 except Exception as e:
                     messagebox.showerror("Error", f"An unexpected error occurred: {e}")
             else:
@@ -831,119 +2271,143 @@ def open_pdf_file():
     else:  # Linux and other Unix-like systems
         os.system(f'xdg-open "{file_path}"')
 
-# Create the main window
-root = ctk.CTk()
-root.title("NGROS Database Management System")
+if __name__ == "__main__":
+    # Command line tools run headless; no arguments opens the GUI
+    if len(sys.argv) > 1:
+        sys.exit(run_cli(sys.argv[1:]))
+
+    # Create the main window
+    root = ctk.CTk()
+    root.title("NGROS Database Management System")
 
-# Calculate the screen width and height
-screen_width = root.winfo_screenwidth()
-screen_height = root.winfo_screenheight()
+    # Calculate the screen width and height
+    screen_width = root.winfo_screenwidth()
+    screen_height = root.winfo_screenheight()
 
-# Set window width and height
-window_width = 850
-window_height = 700
+    # Set window width and height
+    window_width = 850
+    window_height = 700
 
-# Calculate x and y coordinates for centering the window
-x_position = int((screen_width - window_width) / 2)
-y_position = int((screen_height - window_height) / 2)
-root.geometry(f"{window_width}x{window_height}+{x_position}+{y_position}")
-
-# Configure grid for the main window
-root.columnconfigure(1, weight=2)
-root.rowconfigure(0, weight=1)
-
-database_frame = ctk.CTkFrame(root)
-database_frame.grid(row=0, column=0, sticky='nsew', padx=5, pady=5)
-
-out_frame = ctk.CTkFrame(root)
-out_frame.grid(row=1, column=0, columnspan=2, sticky='nsew', padx=5, pady=5)
-
-input_frame = ctk.CTkFrame(database_frame)
-input_frame.grid(row=1, column=0, sticky='nsew', padx=5, pady=5)
-
-info_frame = ctk.CTkFrame(database_frame)
-info_frame.grid(row=2, column=0, sticky='nsew', padx=5, pady=5)
-
-out_text = scrolledtext.ScrolledText(out_frame, height=10, width=50)
-out_text.pack(padx=5, pady=5, expand=True, fill="both")
-scrolledtext_font = tkfont.Font(family="Calibri", size=13)  # Example font family and size
-out_text.configure(font=scrolledtext_font)
-
-display_frame = ctk.CTkFrame(root)
-display_frame.grid(row=0, column=1, sticky='nsew', padx=5, pady=5)
-
-info_label = ctk.CTkLabel(info_frame, text='Hello World', anchor="nw", font=('Calibri', 13))
-info_label.pack(padx=5, pady=5, expand=True, fill="both")
-
-# Create the label with the clickable shortcut
-clickable_label = ctk.CTkLabel(info_frame, text="Parameter Document", anchor="nw", 
-                               font=('Calibri', 13), cursor="hand2", text_color=("blue", "yellow"))
-clickable_label.pack(padx=5, pady=5, expand=True, fill="both")
-
-clickable_label.bind("<Button-1>", lambda event: open_pdf_file())
-
-# Add button to input file or folder
-add_site_button = ctk.CTkButton(input_frame, text="Upload New Site", command=add_site)
-add_site_button.grid(row=0, column=0, sticky='nsew', padx=5, pady=5)
-
-export_site_button = ctk.CTkButton(input_frame, text="Export Database", command=export_site)
-export_site_button.grid(row=0, column=1, sticky='nsew', padx=5, pady=5)
-
-# Add combo box for display option selection
-extent_label = ctk.CTkLabel(input_frame, text="Show Sites as:")
-extent_label.grid(row=1, column=0, sticky='nsew', padx=5, pady=10)
-
-display_options = ["Table", "Map"]
-display_var = ctk.StringVar()
-display_combobox = ctk.CTkComboBox(input_frame, values=display_options, variable=display_var)
-display_combobox.set("Select an option")
-display_combobox.grid(row=1, column=1, sticky='nsew', padx=5, pady=10)
-display_var.trace("w", lambda *args: on_combobox_select())
-
-separator = ttk.Separator(input_frame, orient=tk.HORIZONTAL)
-separator.grid(row=2, column=0, columnspan=2, padx=5, pady=10, sticky='ew')
-
-# Combobox to select file
-file_label = ctk.CTkLabel(input_frame, text="Select Site File for Updation:")
-file_label.grid(row=4, column=0, sticky='nsew', padx=5, pady=10)
-
-selected_file = ctk.StringVar()
-combobox = ctk.CTkComboBox(input_frame, variable=selected_file, state="readonly")
-combobox.grid(row=4, column=1, sticky='nsew', padx=5, pady=10)
-
-# Populate combobox with site files
-site_files = [f for f in os.listdir(SITE_FILES_FOLDER) if f.endswith('.csv')]
-combobox.configure(values = site_files)
-
-# Button to fetch and update data
-meteo_button = ctk.CTkButton(input_frame, text="Fetch Meteorological Data", 
-                              command=lambda: on_update(selected_file.get(), input_frame))
-meteo_button.grid(row=5, column = 0, sticky='nsew', padx=5, pady=5)
-
-topo_button = ctk.CTkButton(input_frame, text="Fetch Topographical Data", state = 'disabled')
-topo_button.grid(row=5, column = 1, sticky='nsew', padx=5, pady=5)
-
-check_var = ctk.StringVar()
-def checkbox_event():
-    if check_var.get() == 'on':
-        site_files = [f for f in os.listdir(SITE_FILES_FOLDER) if f.endswith('.csv')]
-        combobox.configure(values = site_files)
-
-checkbox = ctk.CTkCheckBox(master=input_frame, text="Refresh Sites", command=checkbox_event, checkbox_height = 18, checkbox_width = 18,
-                                     variable=check_var, onvalue="on", offvalue="off")
-checkbox.grid(row=3, column = 0, sticky='nsew', padx=5, pady=5)
-checkbox.select()
-
-# Ensure that widgets take the full space of the frames
-database_frame.grid_rowconfigure(1, weight=1)
-database_frame.grid_rowconfigure(2, weight=1)
-database_frame.grid_columnconfigure(0, weight=1)
-out_frame.grid_rowconfigure(0, weight=1)
-display_frame.grid_rowconfigure(0, weight=1)
-display_frame.grid_columnconfigure(0, weight=1)
-
-# Load site list on startup
-load_site_list()
-plt.ioff()
-plt.close()
-root.mainloop()
+    # Calculate x and y coordinates for centering the window
+    x_position = int((screen_width - window_width) / 2)
+    y_position = int((screen_height - window_height) / 2)
+    root.geometry(f"{window_width}x{window_height}+{x_position}+{y_position}")
+
+    # Configure grid for the main window
+    root.columnconfigure(1, weight=2)
+    root.rowconfigure(0, weight=1)
+
+    database_frame = ctk.CTkFrame(root)
+    database_frame.grid(row=0, column=0, sticky='nsew', padx=5, pady=5)
+
+    out_frame = ctk.CTkFrame(root)
+    out_frame.grid(row=1, column=0, columnspan=2, sticky='nsew', padx=5, pady=5)
+
+    input_frame = ctk.CTkFrame(database_frame)
+    input_frame.grid(row=1, column=0, sticky='nsew', padx=5, pady=5)
+
+    info_frame = ctk.CTkFrame(database_frame)
+    info_frame.grid(row=2, column=0, sticky='nsew', padx=5, pady=5)
+
+    out_text = scrolledtext.ScrolledText(out_frame, height=10, width=50)
+    out_text.pack(padx=5, pady=5, expand=True, fill="both")
+    scrolledtext_font = tkfont.Font(family="Calibri", size=13)  # Example font family and size
+    out_text.configure(font=scrolledtext_font)
+
+    display_frame = ctk.CTkFrame(root)
+    display_frame.grid(row=0, column=1, sticky='nsew', padx=5, pady=5)
+
+    info_label = ctk.CTkLabel(info_frame, text='Hello World', anchor="nw", font=('Calibri', 13))
+    info_label.pack(padx=5, pady=5, expand=True, fill="both")
+
+    # Create the label with the clickable shortcut
+    clickable_label = ctk.CTkLabel(info_frame, text="Parameter Document", anchor="nw", 
+                                   font=('Calibri', 13), cursor="hand2", text_color=("blue", "yellow"))
+    clickable_label.pack(padx=5, pady=5, expand=True, fill="both")
+
+    clickable_label.bind("<Button-1>", lambda event: open_pdf_file())
+
+    # Add button to input file or folder
+    add_site_button = ctk.CTkButton(input_frame, text="Upload New Site", command=add_site)
+    add_site_button.grid(row=0, column=0, sticky='nsew', padx=5, pady=5)
+
+    export_site_button = ctk.CTkButton(input_frame, text="Export Database", command=export_site)
+    export_site_button.grid(row=0, column=1, sticky='nsew', padx=5, pady=5)
+
+    # Add combo box for display option selection
+    extent_label = ctk.CTkLabel(input_frame, text="Show Sites as:")
+    extent_label.grid(row=1, column=0, sticky='nsew', padx=5, pady=10)
+
+    display_options = ["Table", "Map"]
+    display_var = ctk.StringVar()
+    display_combobox = ctk.CTkComboBox(input_frame, values=display_options, variable=display_var)
+    display_combobox.set("Select an option")
+    display_combobox.grid(row=1, column=1, sticky='nsew', padx=5, pady=10)
+    display_var.trace("w", lambda *args: on_combobox_select())
+
+    separator = ttk.Separator(input_frame, orient=tk.HORIZONTAL)
+    separator.grid(row=2, column=0, columnspan=2, padx=5, pady=10, sticky='ew')
+
+    # Combobox to select file
+    file_label = ctk.CTkLabel(input_frame, text="Select Site File for Updation:")
+    file_label.grid(row=4, column=0, sticky='nsew', padx=5, pady=10)
+
+    selected_file = ctk.StringVar()
+    combobox = ctk.CTkComboBox(input_frame, variable=selected_file, state="readonly")
+    combobox.grid(row=4, column=1, sticky='nsew', padx=5, pady=10)
+
+    # Populate combobox with site files
+    matched = site_filter_files()
+    site_files = [f for f in list_site_files() if matched is None or f in matched]
+    combobox.configure(values = site_files)
+
+    # Button to fetch and update data
+    meteo_button = ctk.CTkButton(input_frame, text="Fetch Meteorological Data", 
+                                  command=lambda: on_update(selected_file.get(), input_frame))
+    meteo_button.grid(row=5, column = 0, sticky='nsew', padx=5, pady=5)
+
+    topo_button = ctk.CTkButton(input_frame, text="Fetch Topographical Data", state = 'disabled')
+    topo_button.grid(row=5, column = 1, sticky='nsew', padx=5, pady=5)
+
+    check_var = ctk.StringVar()
+    def checkbox_event():
+        if check_var.get() == 'on':
+            matched = site_filter_files()
+            site_files = [f for f in list_site_files() if matched is None or f in matched]
+            combobox.configure(values = site_files)
+
+    checkbox = ctk.CTkCheckBox(master=input_frame, text="Refresh Sites", command=checkbox_event, checkbox_height = 18, checkbox_width = 18,
+                                         variable=check_var, onvalue="on", offvalue="off")
+    checkbox.grid(row=3, column = 0, sticky='nsew', padx=5, pady=5)
+    checkbox.select()
+
+    # Spatial site filter, e.g. radius:-33.87,151.21,50 or region:Victoria (Enter applies, empty clears)
+    filter_entry = ctk.CTkEntry(input_frame, placeholder_text="Filter: radius:LAT,LON,KM")
+    filter_entry.grid(row=3, column=1, sticky='nsew', padx=5, pady=5)
+    filter_entry.bind("<Return>", lambda event: apply_site_filter(filter_entry.get()))
+
+    # Ensure that widgets take the full space of the frames
+    database_frame.grid_rowconfigure(1, weight=1)
+    database_frame.grid_rowconfigure(2, weight=1)
+    database_frame.grid_columnconfigure(0, weight=1)
+    out_frame.grid_rowconfigure(0, weight=1)
+    display_frame.grid_rowconfigure(0, weight=1)
+    display_frame.grid_columnconfigure(0, weight=1)
+
+    # Status of queued and running jobs (updates, uploads, deletions)
+    jobs_label = Label(input_frame, text="", anchor='w', font=('Calibri', 12))
+    jobs_label.grid(row=8, column=0, columnspan=2, sticky='nsew', padx=5, pady=5)
+
+    # Size and hit rate of the shared site data cache
+    cache_label = Label(input_frame, text="", anchor='w', font=('Calibri', 12))
+    cache_label.grid(row=9, column=0, columnspan=2, sticky='nsew', padx=5, pady=5)
+
+    # Background jobs report to the GUI through this queue; gui_update drains it on the Tk thread
+    gui_queue = queue.Queue()
+    root.after(100, gui_update, gui_queue)
+    refresh_job_status()
+    refresh_cache_status()
+
+    # Load site list on startup
+    load_site_list()
+    root.mainloop()
@@ -0,0 +1,21 @@
+import os
+import subprocess
+import sys
+import textwrap
+
+import pytest
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+@pytest.fixture
+def run_script(tmp_path):
+    # main creates its database folder in the working directory on import, so scripts that use it run in a
+    # subprocess inside tmp_path. Returns the script's stdout; fails the test if the script fails.
+    def run(script, backend="csv"):
+        env = dict(os.environ, PYTHONPATH=REPO_ROOT, NGROS_BACKEND=backend)
+        result = subprocess.run([sys.executable, "-c", textwrap.dedent(script)], cwd=tmp_path, env=env,
+                                capture_output=True, text=True, timeout=120)
+        assert result.returncode == 0, result.stderr
+        return result.stdout
+    return run
@@ -0,0 +1,19 @@
+SCRIPT = """
+    import main
+
+    def broken(job=None):
+        raise ValueError("disk full")
+
+    job, created = main.submit_job('update', 'site.csv', broken, locks=['site.csv'])
+    job['done'].wait()
+    print(main.job_summary())
+    print(main.take_job_failures())
+    print(main.take_job_failures())
+"""
+
+
+def test_failed_job_is_reported(run_script):
+    summary, first, second = run_script(SCRIPT).splitlines()
+    assert summary == "Jobs: update site.csv (failed: disk full)"
+    assert first == "[{'id': 1, 'kind': 'update', 'target': 'site.csv', 'error': 'disk full'}]"
+    assert second == "[]"
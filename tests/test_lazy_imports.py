@@ -0,0 +1,31 @@
+# The command line and update paths must not load the heavy mapping and plotting libraries;
+# geopandas, rasterio and matplotlib are imported only by the map and plot windows.
+
+SCRIPT = """
+    import queue, sys
+    import pandas as pd
+    import main
+
+    times = pd.date_range("2024-01-01", periods=48, freq="h")
+    pd.DataFrame({"local_time": times.strftime("%Y-%m-%d %H:%M:%S"), "drip_rate": range(48)}).to_csv(
+        "database/site_files/site.csv", index=False)
+    main.add_site_records([{"File Name": "site.csv", "Site ID": "S1", "Latitude": -35.0, "Longitude": 149.0}])
+
+    def fake_fetch_api_data(api_url):
+        rows = ["YEAR,MO,DY,HR,PRECTOTCORR,T2M,RH2M,WS2M,ALLSKY_SFC_SW_DWN"]
+        rows += [f"2024,1,1,{hour},0.1,20.5,60.0,3.2,100.0" for hour in range(24)]
+        return "\\n" * 13 + "\\n".join(rows) + "\\n"
+    main.fetch_api_data = fake_fetch_api_data
+
+    assert len(main.read_site_list()) == 1
+    assert len(main.query_site_series("site.csv", max_points=10)) > 0
+    main.fetch_and_update_data("site.csv", None, "status", queue.Queue())
+    assert main.query_site_series("site.csv")["T2M"].notna().all()
+
+    loaded = [name for name in ("geopandas", "rasterio", "matplotlib") if name in sys.modules]
+    print(",".join(loaded))
+"""
+
+
+def test_headless_paths_do_not_import_heavy_modules(run_script):
+    assert run_script(SCRIPT).strip() == ""
@@ -0,0 +1,39 @@
+import pytest
+
+EMPTY_FILE_SCRIPT = """
+    import queue
+    import main
+
+    with open("database/site_files/empty.csv", "w") as f:
+        f.write("local_time,drip_rate\\n")
+    with open("database/site_list.csv", "a") as f:
+        f.write("1,empty.csv,E,-35.0,149.0\\n")
+    if main.DATABASE_BACKEND == "sqlite":
+        print(main.import_csv_layout())
+    main.fetch_and_update_data("empty.csv", None, "status", queue.Queue())
+    print(len(main.get_rollups("empty.csv")), len(main.query_site_series("empty.csv", max_points=10)))
+"""
+
+
+@pytest.mark.parametrize("backend", ["csv", "sqlite"])
+def test_site_file_without_rows(run_script, backend):
+    expected = (["1"] if backend == "sqlite" else []) + ["0", "0"]
+    assert run_script(EMPTY_FILE_SCRIPT, backend).split() == expected
+
+
+BAD_FILE_SCRIPT = """
+    import pandas as pd
+    import main
+
+    pd.DataFrame({"time": ["2024-01-01 00:00:00"], "drip_rate": [1.0]}).to_csv("database/site_files/bad.csv", index=False)
+    try:
+        main.add_site_records([{"File Name": "bad.csv", "Site ID": "B", "Latitude": -35.0, "Longitude": 149.0}])
+    except KeyError:
+        print("failed")
+    print(len(main.read_site_list()))
+"""
+
+
+@pytest.mark.parametrize("backend", ["csv", "sqlite"])
+def test_failed_add_leaves_site_list_unchanged(run_script, backend):
+    assert run_script(BAD_FILE_SCRIPT, backend).split() == ["failed", "0"]
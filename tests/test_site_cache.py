@@ -0,0 +1,18 @@
+SCRIPT = """
+    import pandas as pd
+    import main
+
+    times = pd.date_range("2024-01-01", periods=48, freq="h")
+    pd.DataFrame({"local_time": times.strftime("%Y-%m-%d %H:%M:%S"), "drip_rate": range(48)}).to_csv(
+        "database/site_files/site.csv", index=False)
+    main.add_site_records([{"File Name": "site.csv", "Site ID": "S1", "Latitude": -35.0, "Longitude": 149.0}])
+    main.query_site_series("site.csv")
+    main.query_site_series("site.csv", columns=["drip_rate"])
+    print(main.site_cache_summary())
+"""
+
+
+def test_cache_summary_counts_hits_and_misses(run_script):
+    summary = run_script(SCRIPT).strip()
+    assert summary.startswith("Site cache: 1 files, ")
+    assert summary.endswith(" MB, 1 hits (50%), 1 misses, 0 evictions")
@@ -0,0 +1,35 @@
+# Site data is held as float32 for display only: updates and imports must store the values exactly as read.
+import pytest
+
+SCRIPT = """
+    import queue
+    import pandas as pd
+    import main
+
+    times = pd.date_range("2024-01-01", periods=48, freq="h")
+    pd.DataFrame({"local_time": times.strftime("%Y-%m-%d %H:%M:%S"),
+                  "drip_rate": [12345.6789, 0.123456789] * 24}).to_csv("database/site_files/site.csv", index=False)
+    main.add_site_records([{"File Name": "site.csv", "Site ID": "S1", "Latitude": -35.0, "Longitude": 149.0}])
+
+    def fake_fetch_api_data(api_url):
+        if "start=20240101" not in api_url:
+            return None  # a failed fetch must leave the file as it was
+        rows = ["YEAR,MO,DY,HR,PRECTOTCORR,T2M,RH2M,WS2M,ALLSKY_SFC_SW_DWN"]
+        rows += [f"2024,1,1,{hour},0.1,20.123456789,60.0,3.2,100.0" for hour in range(24)]
+        return "\\n" * 13 + "\\n".join(rows) + "\\n"
+    main.fetch_api_data = fake_fetch_api_data
+
+    main.fetch_and_update_data("site.csv", None, "status", queue.Queue(), chunked={chunked})
+    if main.DATABASE_BACKEND == "sqlite":
+        main.export_csv_layout("export")
+        df = pd.read_csv("export/site_files/site.csv")
+    else:
+        df = pd.read_csv("database/site_files/site.csv")
+    print(sorted(set(df["drip_rate"])), sorted(set(df["T2M"].dropna())), int(df["T2M"].isna().sum()))
+"""
+
+
+@pytest.mark.parametrize("backend, chunked", [("csv", False), ("csv", True), ("sqlite", False)])
+def test_update_keeps_measurements_exact(run_script, backend, chunked):
+    output = run_script(SCRIPT.replace("{chunked}", str(chunked)), backend)
+    assert output.split() == ["[0.123456789,", "12345.6789]", "[20.123456789]", "24"]